@@ -14,16 +14,21 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import logging
+import os
+
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
 import pygame
 
 from sugar3.activity.activity import Activity
+from sugar3.activity.activity import get_activity_root
 from sugar3.graphics.toolbarbox import ToolbarBox
 from sugar3.activity.widgets import ActivityToolbarButton
 from sugar3.graphics.toolbutton import ToolButton
 from sugar3.activity.widgets import StopButton
+from sugar3.graphics.objectchooser import ObjectChooser
 
 import sugargame.canvas
 
@@ -38,11 +43,14 @@ class FourierSeriesActivity(Activity):
         self.max_participants = 1
         self.sound = True
         self.fourier = FourierSim()
+        self.fourier.config.shape_cache = os.path.join(
+            get_activity_root(), 'data', 'shapes')
         self.build_toolbar()
         self.fourier.canvas = sugargame.canvas.PygameCanvas(
             self,
             main=self.fourier.run,
             modules=[pygame.display, pygame.font, pygame.mixer])
+        self.fourier.canvas.translator.record_strokes(self.fourier.stroke)
         self.set_canvas(self.fourier.canvas)
         self.fourier.canvas.grab_focus()
 
@@ -61,6 +69,12 @@ class FourierSeriesActivity(Activity):
         toolbar_box.toolbar.insert(separator, -1)
         separator.show()
 
+        shape_button = ToolButton('document-open')
+        shape_button.set_tooltip(_('Load Shape'))
+        shape_button.connect('clicked', self._load_shape_cb)
+        toolbar_box.toolbar.insert(shape_button, -1)
+        shape_button.show()
+
         help_button = ToolButton('toolbar-help')
         help_button.set_tooltip(_('How To Play'))
         help_button.connect('clicked', self.show_help)
@@ -78,8 +92,23 @@ class FourierSeriesActivity(Activity):
         stop_button.show()
         stop_button.connect('clicked', self._stop_cb)
 
+    def get_preview(self):
+        return self.fourier.canvas.get_preview()
+
     def show_help(self, button):
         self.fourier.show_help()
 
+    def _load_shape_cb(self, button):
+        chooser = ObjectChooser(self)
+        try:
+            if chooser.run() == Gtk.ResponseType.ACCEPT:
+                jobject = chooser.get_selected_object()
+                if jobject and jobject.file_path:
+                    self.fourier.load_shape(jobject.file_path)
+        except (OSError, ValueError):
+            logging.exception('Could not load the shape')
+        finally:
+            chooser.destroy()
+
     def _stop_cb(self, button):
         self.fourier.running = False
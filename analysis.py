@@ -0,0 +1,123 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+
+def fourier_series(samples, count):
+    """Analyse one period of evenly spaced samples.
+
+    Uses a single real FFT, so the cost is O(N log N) in the number of
+    samples. Returns ``(harmonics, amplitudes, phases)`` for harmonics
+    ``1..count`` such that the samples are approximated by
+    ``mean + sum(amplitude * sin(harmonic * t + phase))`` over
+    ``t`` in ``[0, 2*pi)``. Fewer harmonics are returned when there are
+    not enough samples to resolve ``count`` of them.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if len(samples) < 2:
+        empty = np.zeros(0)
+        return empty, empty, empty
+
+    spectrum = np.fft.rfft(samples)[1:count + 1]
+    harmonics = np.arange(1, len(spectrum) + 1, dtype=np.float64)
+    amplitudes = 2 * np.abs(spectrum) / len(samples)
+    # rfft bins describe cosines, shift by a quarter turn to get sines
+    phases = np.angle(spectrum) + np.pi / 2
+    return harmonics, amplitudes, phases
+
+
+def complex_series(points, count):
+    """Analyse a closed 2D path as one period of a complex signal.
+
+    ``points`` is an ``(n, 2)`` array of x and y. The path is closed,
+    resampled to evenly spaced points along its length and transformed
+    with a single complex FFT. Returns ``(centre, coefficients,
+    harmonics)`` with the ``count`` largest terms, positive and negative
+    frequencies alike, sorted by magnitude such that the path is
+    approximated by ``centre + sum(coefficient * e^(i * harmonic * t))``
+    over ``t`` in ``[0, 2*pi)``.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    empty = np.zeros(0)
+    if len(points) < 2:
+        return 0j, empty.astype(np.complex128), empty
+
+    path = points[:, 0] + 1j * points[:, 1]
+    path = np.append(path, path[0])
+    distance = np.concatenate(([0], np.cumsum(np.abs(np.diff(path)))))
+    if distance[-1] == 0:
+        return complex(path[0]), empty.astype(np.complex128), empty
+
+    # Enough samples to resolve count terms on either side of zero
+    length = max(len(points), 2 * count + 1)
+    even = np.linspace(0, distance[-1], length, endpoint=False)
+    x = np.interp(even, distance, path.real)
+    y = np.interp(even, distance, path.imag)
+    samples = x + 1j * y
+
+    return complex_spectrum(samples, count)
+
+
+def complex_spectrum(samples, count):
+    """Analyse one period of evenly spaced complex samples.
+
+    Returns ``(centre, coefficients, harmonics)`` like complex_series,
+    for samples that are already spaced evenly along the path.
+    """
+    samples = np.asarray(samples, dtype=np.complex128)
+    length = len(samples)
+    spectrum = np.fft.fft(samples) / length
+    harmonics = np.fft.fftfreq(length, 1 / length)
+    order = np.argsort(-np.abs(spectrum[1:]), kind="stable")[:count] + 1
+    return complex(spectrum[0]), spectrum[order], harmonics[order]
+
+
+class RunningSpectrum:
+    """The series of ``fourier_series`` for samples that change one by one.
+
+    ``length`` evenly spaced samples make up one period, all 0 to begin
+    with. Setting sample ``j`` from ``old`` to ``new`` moves bin ``k`` by
+    ``(new - old) * e^(-2 pi i k j / length)``, so an update costs
+    O(count) per sample instead of a new FFT over all of them.
+    """
+
+    def __init__(self, length, count):
+        self.length = length
+        count = min(count, length // 2)
+        self.harmonics = np.arange(1, count + 1, dtype=np.float64)
+        self.values = np.zeros(length)
+        self.bins = np.zeros(len(self.harmonics), dtype=np.complex128)
+
+    def set(self, indices, values):
+        """Set the samples at ``indices``, the last value wins for repeats."""
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        _, last = np.unique(indices[::-1], return_index=True)
+        keep = len(indices) - 1 - last
+        indices = indices[keep]
+        values = values[keep]
+
+        delta = values - self.values[indices]
+        self.values[indices] = values
+        turns = np.outer(indices, self.harmonics) * (-2j * np.pi / self.length)
+        self.bins += delta @ np.exp(turns)
+
+    def series(self):
+        """Return ``(harmonics, amplitudes, phases)`` like fourier_series."""
+        amplitudes = 2 * np.abs(self.bins) / self.length
+        phases = np.angle(self.bins) + np.pi / 2
+        return self.harmonics, amplitudes, phases
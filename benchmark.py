@@ -0,0 +1,250 @@
+#! /usr/bin/env python3
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Frame-time benchmark of the simulation view.
+
+Drives the view headlessly over every combination of circle count,
+quality level, theme and panel visibility and reports the cost of each
+render stage.
+
+Record a baseline, then compare later runs against it:
+    python3 benchmark.py --output baseline.json
+    python3 benchmark.py --output new.json --compare baseline.json
+"""
+
+import headless  # noqa: F401, selects the dummy SDL drivers
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from config import Config
+from main import FourierSim
+
+STAGES = [
+    "draw_controls",
+    "display_equation",
+    "draw_coefficients",
+    "epicycles",
+    "draw_catmull_rom_spline",
+]
+# Stages that draw the cached UI layer, which is only redrawn on changes
+UI_STAGES = STAGES[:3]
+
+
+def circle_counts(maximum):
+    counts = [1]
+    while counts[-1] * 2 < maximum:
+        counts.append(counts[-1] * 2)
+    counts.append(maximum)
+    return counts
+
+
+def cases(counts):
+    combinations = itertools.product(
+        counts, (0, 1, 2), (False, True), (False, True), (False, True))
+    for circles, quality, dark, show_help, show_coefficients in combinations:
+        yield {
+            "circles": circles,
+            "quality": quality,
+            "dark": dark,
+            "show_help": show_help,
+            "show_coefficients": show_coefficients,
+        }
+
+
+def case_key(case):
+    return "circles=%d quality=%d theme=%s help=%s coefficients=%s" % (
+        case["circles"], case["quality"],
+        "dark" if case["dark"] else "light",
+        "on" if case["show_help"] else "off",
+        "on" if case["show_coefficients"] else "off")
+
+
+def run_case(case, frames, warmup):
+    fourier = FourierSim(clock=headless.VirtualClock())
+    config = fourier.config
+    config.num_circles = case["circles"]
+    config.quality = case["quality"]
+    config.dark = case["dark"]
+    config.show_help = case["show_help"]
+    config.show_coefficients = case["show_coefficients"]
+
+    profiler = fourier.profiler
+    profiler.enabled = True
+    fourier.setup()
+
+    for _ in range(warmup):
+        fourier.frame()
+    profiler.reset()
+
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        fourier.frame()
+        frame_times.append(time.perf_counter() - start)
+    stages = stage_times(profiler, STAGES)
+
+    # The UI layer stays cached while nothing changes, so time its stages
+    # on further frames that each rebuild it
+    profiler.reset()
+    for _ in range(frames):
+        fourier.redraw_ui_function()
+        fourier.frame()
+    stages.update(stage_times(profiler, UI_STAGES))
+
+    times = np.asarray(frame_times) * 1000
+    return {
+        "frame": {
+            "mean_ms": float(times.mean()),
+            "p50_ms": float(np.percentile(times, 50)),
+            "p95_ms": float(np.percentile(times, 95)),
+        },
+        "stages": stages,
+    }
+
+
+def stage_times(profiler, names):
+    stages = {}
+    for name in names:
+        per_frame = [frame.get(name, 0.0) for frame in profiler.frames]
+        ran = [frame[name] for frame in profiler.frames if name in frame]
+        calls = profiler.calls.get(name, 0)
+        total = profiler.totals.get(name, 0.0)
+        stages[name] = {
+            "per_frame_ms": float(np.mean(per_frame)) * 1000,
+            "per_call_ms": total / calls * 1000 if calls else 0.0,
+            # Median of the frames the stage ran in, robust to stray
+            # slow frames unlike the means
+            "p50_ms": float(np.median(ran)) * 1000 if ran else 0.0,
+            "calls": calls,
+        }
+    return stages
+
+
+def best_run(runs):
+    """Merge repeated runs of a case, keeping the fastest of each time.
+
+    Noise from the rest of the machine only ever makes a run slower, so
+    the minimum over a few runs is the steadiest figure to compare.
+    """
+    best = json.loads(json.dumps(runs[0]))
+    for run in runs[1:]:
+        for name, value in run["frame"].items():
+            best["frame"][name] = min(best["frame"][name], value)
+        for name, stage in run["stages"].items():
+            for field, value in stage.items():
+                if field != "calls":
+                    kept = best["stages"][name][field]
+                    best["stages"][name][field] = min(kept, value)
+    return best
+
+
+def compare(results, baseline, threshold, floor):
+    """Return a list of human readable regressions against a baseline.
+
+    Compares the median frame time and the median time of every stage
+    in the frames it ran, which is its cost per call.
+    """
+    regressions = []
+    for key, case in results["cases"].items():
+        old = baseline["cases"].get(key)
+        if old is None:
+            continue
+        pairs = [("frame", case["frame"]["p50_ms"], old["frame"]["p50_ms"])]
+        for name, stage in case["stages"].items():
+            if "p50_ms" in old["stages"].get(name, {}):
+                pairs.append((name, stage["p50_ms"],
+                              old["stages"][name]["p50_ms"]))
+        for name, new_ms, old_ms in pairs:
+            if new_ms - old_ms > floor and new_ms > old_ms * (1 + threshold):
+                regressions.append("%s: %s %.3f ms -> %.3f ms" % (
+                    key, name, old_ms, new_ms))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every render stage of the simulation view.")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="file to write the results to (JSON)")
+    parser.add_argument("--compare",
+                        help="baseline results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown counted as a regression")
+    parser.add_argument("--floor", type=float, default=0.25,
+                        help="ignore slowdowns smaller than this many ms")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each case, the fastest is kept")
+    parser.add_argument("--size", default="1200x900")
+    parser.add_argument("--circles", type=int, nargs="*",
+                        help="circle counts to sweep, "
+                             "default 1..max by octaves")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    counts = args.circles or circle_counts(Config().max_circles)
+
+    pygame.init()
+    pygame.display.set_mode((width, height))
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "size": args.size,
+        },
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    for case in cases(counts):
+        runs = [run_case(case, args.frames, args.warmup)
+                for _ in range(max(1, args.repeat))]
+        results["cases"][case_key(case)] = best_run(runs)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    pygame.quit()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.floor)
+        for line in regressions:
+            print("REGRESSION " + line)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,21 @@
 class Config:
     def __init__(self):
         self.fps = 60
+        self.sim_rate = 60  # Simulation steps per second, independent of fps
+        self.path_resolution = 1024  # Least samples per period of motion
         self.speed = 1
-        self.num_circles = 3
+        self.num_circles = 6
+        self.max_circles = 2048
+        self.shape_cache = None  # Analysed shapes, see shapes.load()
         self.dark = False
+
+        # Initial state of the simulation view
+        self.frequency = 1 / 100
+        self.waveform = "square"
+        self.quality = 1  # Low, Medium, High or 3 for automatic
+        self.show_coefficients = True
+        self.show_help = False
+
+        # Frame timing overlay, also toggled with F12
+        self.profile = False
+        self.profile_csv = None
@@ -0,0 +1,176 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def make_series(radii, harmonics, phases=None):
+    """Pack radii and phases into complex coefficients.
+
+    Returns a ``(coefficients, harmonics)`` pair of NumPy arrays where
+    each coefficient is ``radius * e^(i * phase)``.
+    """
+    radii = np.asarray(radii, dtype=np.float64)
+    harmonics = np.asarray(harmonics, dtype=np.float64)
+    if phases is None:
+        return radii.astype(np.complex128), harmonics
+    phases = np.asarray(phases, dtype=np.float64)
+    return radii * np.exp(1j * phases), harmonics
+
+
+def evaluate(coefficients, harmonics, times, origin=0j):
+    """Evaluate an epicycle chain for a batch of time values.
+
+    Every circle ``k`` contributes the phasor
+    ``coefficients[k] * e^(i * harmonics[k] * t)``; the chain is the
+    cumulative sum of those phasors starting at ``origin``.
+
+    Returns ``(centres, tips)`` as complex arrays. ``centres`` has shape
+    ``(len(times), len(coefficients))`` and holds the centre of every
+    circle, ``tips`` has shape ``(len(times),)`` and holds the end point
+    of the chain. Screen coordinates are ``(z.real, z.imag)``.
+    """
+    coefficients = np.asarray(coefficients, dtype=np.complex128)
+    harmonics = np.asarray(harmonics, dtype=np.float64)
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+
+    phasors = coefficients * np.exp(1j * np.outer(times, harmonics))
+    chain = np.cumsum(phasors, axis=1)
+
+    centres = np.empty_like(chain)
+    centres[:, 0] = origin
+    centres[:, 1:] = chain[:, :-1] + origin
+    if chain.shape[1]:
+        tips = chain[:, -1] + origin
+    else:
+        tips = np.full(len(times), origin, dtype=np.complex128)
+    return centres, tips
+
+
+def total_radius(coefficients):
+    """Return the largest distance the chain can reach from its origin."""
+    return float(np.abs(coefficients).sum())
+
+
+def level_of_detail(coefficients, min_radius=1):
+    """Split a chain into individually drawn circles and a tail.
+
+    Returns an order of the circles and how many of them, first in that
+    order, are at least ``min_radius`` across. The rest are too small to
+    see wherever they sit in the chain; chained after the others they
+    add up to one aggregate vector ending at the same tip.
+    """
+    visible = np.abs(coefficients) >= min_radius
+    order = np.concatenate((np.flatnonzero(visible),
+                            np.flatnonzero(~visible)))
+    return order, int(np.count_nonzero(visible))
+
+
+def period_samples(step, resolution):
+    """Return how many evenly spaced times to tabulate per period.
+
+    The chain repeats every 2 pi. When a whole number of time steps of
+    size ``step`` makes up one period, the count is a multiple of it, so
+    every step lands exactly on a sample; otherwise it is ``resolution``
+    and times are rounded to the nearest sample.
+    """
+    steps = 2 * np.pi / step if step else 0
+    whole = round(steps)
+    if whole >= 1 and abs(steps - whole) < 1e-6:
+        return whole * max(1, -(-resolution // whole))
+    return resolution
+
+
+class PathTable:
+    """Chain points over one period, relative to the origin.
+
+    ``columns`` picks points of the chain, where index ``k`` is the
+    centre of circle ``k`` and ``len(coefficients)`` is the tip.
+    """
+
+    CHUNK = 256  # Times evaluated at once, bounds the temporary arrays
+
+    def __init__(self, coefficients, harmonics, columns, samples):
+        self.samples = samples
+        self.points = np.empty((samples, len(columns)), dtype=np.complex128)
+        coefficients = np.asarray(coefficients, dtype=np.complex128)
+        times = np.arange(min(self.CHUNK, samples)) * (2 * np.pi / samples)
+
+        # Later chunks are the first one rotated on by a whole chunk,
+        # which is much cheaper than evaluating every exponential
+        phasors = coefficients * np.exp(1j * np.outer(times, harmonics))
+        turn = np.exp(1j * harmonics * (self.CHUNK * 2 * np.pi / samples))
+        chain = np.zeros((len(times), len(coefficients) + 1),
+                         dtype=np.complex128)
+        for start in range(0, samples, self.CHUNK):
+            rows = min(self.CHUNK, samples - start)
+            np.cumsum(phasors, axis=1, out=chain[:, 1:])
+            self.points[start:start + rows] = chain[:rows, columns]
+            phasors *= turn
+        self.points.flags.writeable = False
+
+    def at(self, time):
+        """Return the points at the sample nearest to ``time``."""
+        row = int(round(time * self.samples / (2 * np.pi))) % self.samples
+        return self.points[row]
+
+
+class PathCache:
+    """The most recently used PathTables, keyed by everything they hold.
+
+    The tables together take at most ``max_bytes``, the least recently
+    used go first. get() returns None for a table of more than
+    ``max_table_bytes`` or one that takes more than ``max_work`` phasor
+    evaluations to build, and the chain has to be evaluated directly.
+    Building happens during a frame, so this bounds the stall too.
+    """
+
+    def __init__(self, max_bytes=2 ** 21, max_table_bytes=2 ** 19,
+                 max_work=2 ** 18):
+        self.max_bytes = max_bytes
+        self.max_table_bytes = max_table_bytes
+        self.max_work = max_work
+        self.nbytes = 0
+        self._tables = OrderedDict()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def get(self, coefficients, harmonics, columns, samples):
+        size = samples * len(columns) * np.dtype(np.complex128).itemsize
+        work = samples * (len(coefficients) + 1)
+        if size > self.max_table_bytes or work > self.max_work:
+            return None
+        key = (coefficients.tobytes(), harmonics.tobytes(),
+               np.asarray(columns).tobytes(), samples)
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            return table
+
+        table = PathTable(coefficients, harmonics, columns, samples)
+        self._tables[key] = table
+        self.nbytes += table.points.nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._tables.popitem(last=False)
+            self.nbytes -= old.points.nbytes
+        return table
+
+    def clear(self):
+        self._tables.clear()
+        self.nbytes = 0
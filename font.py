@@ -14,16 +14,21 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from collections import OrderedDict
+
 import pygame
 
 
 class Font:
+    CACHE_SIZE = 256
+
     def __init__(self):
         self.sm = None
         self.md = None
         self.lg = None
         self.xl = None
         self.xxl = None
+        self._cache = OrderedDict()
 
     def intialize(self, file):
         self.sm = self.load_font(file, 10)
@@ -34,3 +39,25 @@ class Font:
 
     def load_font(self, file, size):
         return pygame.font.Font(file, size)
+
+    def render(self, text, size, color):
+        """Render antialiased text, reusing surfaces rendered before.
+
+        ``size`` is one of the attribute names above ("sm", "md", ...).
+        The least recently used surfaces are dropped once the cache
+        holds CACHE_SIZE of them.
+        """
+        key = (text, size, tuple(color))
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            return surface
+
+        surface = getattr(self, size).render(text, True, color)
+        self._cache[key] = surface
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return surface
+
+    def clear_cache(self):
+        self._cache.clear()
@@ -0,0 +1,176 @@
+#! /usr/bin/env python3
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Run the simulation offscreen, without Sugar or GTK.
+
+Example:
+    python3 headless.py --frames 600 --circles 12 --waveform triangle \\
+        --frames-dir frames --every 10 --metrics metrics.json
+"""
+
+import os
+
+# Must be set before pygame initialises its video subsystem
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pygame
+
+import waveforms
+from main import FourierSim
+
+
+class VirtualClock:
+    """Stand-in for pygame.time.Clock that never sleeps.
+
+    Every tick advances the virtual time by exactly one frame at the
+    requested frame rate, so runs are reproducible on any machine.
+    """
+
+    def __init__(self):
+        self.time = 0
+        self._last = 0
+        self._raw = 0
+        self._tick_start = time.perf_counter()
+
+    def tick(self, framerate=0):
+        # Real work time since the last tick, like Clock.get_rawtime()
+        now = time.perf_counter()
+        self._raw = (now - self._tick_start) * 1000
+        self._tick_start = now
+
+        self._last = 1000 / framerate if framerate else 0
+        self.time += self._last
+        return self._last
+
+    def get_time(self):
+        return self._last
+
+    def get_rawtime(self):
+        return self._raw
+
+    def get_fps(self):
+        return 1000 / self._last if self._last else 0.0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render the Fourier series simulation offscreen.")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="number of frames to render")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="virtual frame rate of the simulation clock")
+    parser.add_argument("--size", default="1200x900",
+                        help="surface size as WIDTHxHEIGHT")
+    parser.add_argument("--circles", type=int, default=6)
+    parser.add_argument("--waveform", default="square",
+                        choices=waveforms.names())
+    parser.add_argument("--frequency", type=float, default=1 / 100)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="animation speed between 0.1 and 1")
+    parser.add_argument("--quality", type=int, default=1, choices=(0, 1, 2, 3),
+                        help="0 low, 1 medium, 2 high, 3 automatic")
+    parser.add_argument("--dark", action="store_true")
+    parser.add_argument("--show-help", action="store_true")
+    parser.add_argument("--hide-coefficients", action="store_true")
+    parser.add_argument("--shape",
+                        help="SVG, CSV or NPY outline to retrace in 2D")
+    parser.add_argument("--shape-cache",
+                        help="directory to cache analysed shapes in")
+    parser.add_argument("--frames-dir",
+                        help="directory to write PNG frames to")
+    parser.add_argument("--every", type=int, default=1,
+                        help="write every Nth frame")
+    parser.add_argument("--metrics",
+                        help="file to write frame time metrics to (JSON)")
+    parser.add_argument("--profile-csv",
+                        help="file to stream per-stage timings to (CSV)")
+    return parser.parse_args(argv)
+
+
+def configure(config, args):
+    config.fps = args.fps
+    config.num_circles = args.circles
+    config.waveform = args.waveform
+    config.frequency = args.frequency
+    config.speed = args.speed
+    config.quality = args.quality
+    config.dark = args.dark
+    config.show_help = args.show_help
+    config.show_coefficients = not args.hide_coefficients
+    config.shape_cache = args.shape_cache
+    config.profile = bool(args.profile_csv)
+    config.profile_csv = args.profile_csv
+
+
+def summarise(frame_times):
+    times = np.asarray(frame_times) * 1000
+    return {
+        "frames": len(times),
+        "mean_ms": float(times.mean()),
+        "p50_ms": float(np.percentile(times, 50)),
+        "p95_ms": float(np.percentile(times, 95)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "max_ms": float(times.max()),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(n) for n in args.size.lower().split("x"))
+
+    pygame.init()
+    pygame.display.set_mode((width, height))
+
+    fourier = FourierSim(clock=VirtualClock())
+    configure(fourier.config, args)
+    fourier.setup()
+    if args.shape:
+        fourier.load_shape(args.shape)
+
+    if args.frames_dir:
+        os.makedirs(args.frames_dir, exist_ok=True)
+
+    frame_times = []
+    for index in range(args.frames):
+        if not fourier.running:
+            break
+        start = time.perf_counter()
+        fourier.frame()
+        frame_times.append(time.perf_counter() - start)
+
+        if args.frames_dir and index % args.every == 0:
+            path = os.path.join(args.frames_dir, "frame_%05d.png" % index)
+            pygame.image.save(fourier.gameDisplay, path)
+
+    if args.metrics and frame_times:
+        metrics = summarise(frame_times)
+        metrics["virtual_ms"] = fourier.clock.time
+        metrics["parameters"] = vars(args)
+        with open(args.metrics, "w") as f:
+            json.dump(metrics, f, indent=2)
+
+    fourier.profiler.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
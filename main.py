@@ -14,26 +14,66 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
+from time import perf_counter
+
 import pygame
-from gi.repository import Gtk
 from config import Config
 from views import simulation
 from font import Font
+from profiler import Profiler
+from stroke import StrokeRecorder
+import shapes
+
+try:
+    from gi.repository import Gtk
+except ImportError:
+    # Headless runs (see headless.py) have no GTK main loop to pump
+    Gtk = None
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
+PROFILE_KEY = pygame.K_F12
+PAUSE_KEY = pygame.K_SPACE
+MAX_FRAME_TIME = 0.25  # Longest stall the simulation catches up on, in s
+PROFILE_REFRESH = 30  # Frames between overlay text updates
+FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "Geist.ttf")
 
 class FourierSim:
-    def __init__(self):
+    def __init__(self, clock=None):
         self.running = True
-        self.clock = pygame.time.Clock()
+        self.clock = clock if clock is not None else pygame.time.Clock()
         self.config = Config()
 
         self.gameDisplay = None
         self.info = None
         self.update_function = None
+        self.fixed_update_function = None
+        self.redraw_ui_function = None  # Rebuilds the view's cached UI
         self.events = []        
         self.font = Font()
+        self.profiler = Profiler()
+        self.stroke = StrokeRecorder()
+        self.shape_event = pygame.event.custom_type()  # See load_shape()
+        self._profile_lines = []
+        self._profile_age = 0
+
+        # Fixed timestep simulation, see frame()
+        self.alpha = 0.0
+        self._accumulator = 0.0
+        self._resynced = False
+
+        # Nothing is drawn while hidden, nothing changes while paused,
+        # see idle() and wait()
+        self.paused = False
+        self.visible = True
+
+        # Dirty rectangle bookkeeping, see mark_dirty() and redraw_all()
+        self.background = None
+        self.dirty_rects = []
+        self.full_update = True
+        self._last_rects = []
 
 
     def vw(self, x):
@@ -49,50 +89,206 @@ class FourierSim:
         centered_coords = (x - rect.width // 2, y - rect.height // 2)
         self.gameDisplay.blit(surf, centered_coords)
 
+    def mark_dirty(self, rect):
+        rect = pygame.Rect(rect).clip(self.display_rect)
+        if rect.width and rect.height:
+            self.dirty_rects.append(rect)
+
+    def redraw_all(self):
+        self.full_update = True
+
+    def clear(self, rect=None):
+        if self.background is not None:
+            if rect is None:
+                self.gameDisplay.blit(self.background, (0, 0))
+            else:
+                self.gameDisplay.blit(self.background, rect, rect)
+        else:
+            self.gameDisplay.fill(BLACK if self.config.dark else WHITE, rect)
+
     def stop(self):
         self.running = False
 
     def set_screen(self, view):
         view(self)
 
+    def load_shape(self, path):
+        """Analyse an SVG, CSV or NPY outline and retrace it in 2D."""
+        terms = shapes.load(path, self.config.max_circles,
+                            self.config.shape_cache)
+        # Posting also wakes wait() up while paused
+        pygame.event.post(pygame.event.Event(self.shape_event, terms=terms))
+
     def show_help(self):
         self.help_popup.show()
 
     def hide_help(self):
         self.help_popup.hide()
 
-    def run(self):
+    def setup(self):
         self.gameDisplay = pygame.display.get_surface()
         self.info = pygame.display.Info()
         self.display_rect = self.gameDisplay.get_rect()
 
-        self.font.intialize("./Geist.ttf")
+        self.font.intialize(FONT_FILE)
         self.set_screen(simulation.view)
 
         if not self.gameDisplay:
             self.gameDisplay = pygame.display.set_mode(
                 (self.info.current_w, self.info.current_h))
             pygame.display.set_caption("Fourier Series Visualisation")
-        
+
+        # Only switch profiling on, benchmark.py enables it before setup()
+        if self.config.profile:
+            self.profiler.enabled = True
+        if self.config.profile_csv:
+            self.profiler.stream_to(self.config.profile_csv)
+
+    def run(self):
+        self.setup()
         while self.running:
-            self.gameDisplay.fill(BLACK if self.config.dark else WHITE)
+            if self.idle():
+                self.wait()
+            self.frame()
+
+        self.profiler.close()
+        return
 
-            if self.update_function is not None:
+    def idle(self):
+        """Return True if the next frame would show nothing new."""
+        if not self.visible:
+            return True
+        # The view reacts to the last frame's events and to held buttons
+        pressed = any(pygame.mouse.get_pressed())
+        return self.paused and not self.events and not pressed
+
+    def wait(self):
+        """Block until an event arrives instead of drawing frames."""
+        if Gtk is not None:
+            # The translator posts GTK input as pygame events
+            while self.running and not pygame.event.peek():
+                Gtk.main_iteration_do(True)
+        else:
+            pygame.event.post(pygame.event.wait())
+        self.resync()
+
+    def resync(self):
+        """Drop the time that passed without frames, e.g. while waiting.
+
+        Otherwise the next frame would catch the simulation up on all of
+        it at once and the epicycles would jump ahead.
+        """
+        self._accumulator = 0.0
+        self.alpha = 0.0
+        self._resynced = True
+        self.clock.tick()
+
+    def toggle_profiling(self):
+        self.profiler.enabled = not self.profiler.enabled
+        self.profiler.reset()
+        self._profile_lines = []
+        self.redraw_all()
+
+    def draw_profile_overlay(self):
+        if self._profile_age <= 0 or not self._profile_lines:
+            p50, p95, p99 = self.profiler.percentiles("frame")
+            stages = sorted(self.profiler.means().items(),
+                            key=lambda item: -item[1])
+            self._profile_lines = [
+                "FPS %.1f  frame p50 %.1f  p95 %.1f  p99 %.1f ms" % (
+                    self.clock.get_fps(), p50, p95, p99),
+            ] + ["%s %.2f ms" % item for item in stages if item[0] != "frame"]
+            self._profile_age = PROFILE_REFRESH
+        self._profile_age -= 1
+
+        color = WHITE if self.config.dark else BLACK
+        surfs = [self.font.render(line, "sm", color)
+                 for line in self._profile_lines]
+        panel = pygame.Rect(0, 0, max(surf.get_width() for surf in surfs) + 8,
+                            sum(surf.get_height() for surf in surfs) + 8)
+        panel.topright = (self.display_rect.width - 4, 4)
+        self.gameDisplay.fill(BLACK if self.config.dark else WHITE, panel)
+        self.mark_dirty(panel)
+
+        y = panel.y + 4
+        for surf in surfs:
+            self.gameDisplay.blit(surf, (panel.x + 4, y))
+            y += surf.get_height()
+
+    def frame(self):
+        profiler = self.profiler
+        start = perf_counter()
+
+        # Only restore what the view drew over last frame
+        if self.full_update:
+            self.clear()
+        else:
+            for rect in self._last_rects:
+                self.clear(rect)
+        self.dirty_rects = []
+
+        # Advance the simulation in fixed steps of real time, however
+        # long the last frame took, and leave the remainder as alpha for
+        # the view to interpolate with
+        if self.fixed_update_function is not None and not self.paused:
+            step = 1 / self.config.sim_rate
+            elapsed = min(self.clock.get_time() / 1000, MAX_FRAME_TIME)
+            if self._resynced:
+                elapsed = 0.0  # The gap ticked away in resync()
+                self._resynced = False
+            self._accumulator += elapsed
+            with profiler.stage("simulate"):
+                while self._accumulator >= step:
+                    self.fixed_update_function()
+                    self._accumulator -= step
+            self.alpha = self._accumulator / step
+
+        if self.update_function is not None:
+            with profiler.stage("update"):
                 self.update_function()
 
-            while Gtk.events_pending():
+        if profiler.enabled:
+            self.draw_profile_overlay()
+
+        with profiler.stage("gtk"):
+            while Gtk is not None and Gtk.events_pending():
                 Gtk.main_iteration()
 
+        with profiler.stage("events"):
             self.events = []
             for event in pygame.event.get():
                 self.events.append(event)
+                if not self.stroke.hooked:
+                    self.stroke.record_event(event)
+                if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                    self.redraw_all()
+                if event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+                    self.toggle_profiling()
+                if event.type == pygame.KEYDOWN and event.key == PAUSE_KEY:
+                    self.paused = not self.paused
+                    self.resync()
+                shown = event.type == pygame.ACTIVEEVENT
+                if shown and event.state & pygame.APPACTIVE:
+                    self.visible = bool(event.gain)
+                    self.resync()
+                    self.redraw_all()
                 if event.type == pygame.QUIT:
                     break
 
-            pygame.display.update()
+        with profiler.stage("display_update"):
+            if self.full_update:
+                pygame.display.update()
+                self.full_update = False
+            else:
+                pygame.display.update(self._last_rects + self.dirty_rects)
+        self._last_rects = self.dirty_rects
+
+        with profiler.stage("clock_wait"):
             self.clock.tick(self.config.fps)
 
-        return
+        if profiler.enabled:
+            profiler.add("frame", perf_counter() - start)
+        profiler.end_frame()
 
 
 if __name__ == "__main__":
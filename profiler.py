@@ -0,0 +1,121 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import csv
+from collections import defaultdict, deque
+from time import perf_counter
+
+import numpy as np
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter() - self.start)
+
+
+class _NullStage:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """Per-stage frame timings, recorded only while enabled.
+
+    Wrap a stage in ``with profiler.stage(name):`` and call
+    ``end_frame()`` once per frame. ``frames`` keeps the stage totals
+    of the most recent frames, ``totals`` and ``calls`` accumulate over
+    the whole run. With ``stream_to()`` every finished frame is also
+    appended to a CSV file as ``frame,stage,ms`` rows.
+    """
+
+    def __init__(self, history=600):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._current = {}
+        self._frame_index = 0
+        self._csv_file = None
+        self._csv = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        self._current[name] = self._current.get(name, 0.0) + seconds
+        self.totals[name] += seconds
+        self.calls[name] += 1
+
+    def end_frame(self):
+        if self.enabled:
+            self.frames.append(self._current)
+            if self._csv is not None:
+                for name, seconds in self._current.items():
+                    self._csv.writerow((self._frame_index, name,
+                                        "%.4f" % (seconds * 1000)))
+            self._frame_index += 1
+        self._current = {}
+
+    def percentiles(self, name, percents=(50, 95, 99)):
+        """Return percentiles in ms of a stage over the recent frames."""
+        samples = [frame[name] for frame in self.frames if name in frame]
+        if not samples:
+            return [0.0] * len(percents)
+        return list(np.percentile(samples, percents) * 1000)
+
+    def means(self):
+        """Return the mean ms per frame of every stage in recent frames."""
+        sums = defaultdict(float)
+        for frame in self.frames:
+            for name, seconds in frame.items():
+                sums[name] += seconds
+        count = max(1, len(self.frames))
+        return {name: total / count * 1000 for name, total in sums.items()}
+
+    def stream_to(self, path):
+        self.close()
+        self._csv_file = open(path, "w", newline="")
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(("frame", "stage", "ms"))
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+        self._csv_file = None
+        self._csv = None
+
+    def reset(self):
+        self.frames.clear()
+        self.totals.clear()
+        self.calls.clear()
+        self._current = {}
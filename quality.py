@@ -0,0 +1,99 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import deque
+
+# Render settings from cheapest to most detailed. trace_step draws every
+# Nth traced point, min_radius is the smallest circle drawn on its own and
+# antialias smooths the circle outlines.
+LEVELS = [
+    dict(spline_segments=1, trace_step=4, min_radius=4, antialias=False),
+    dict(spline_segments=3, trace_step=2, min_radius=2, antialias=False),
+    dict(spline_segments=3, trace_step=1, min_radius=1, antialias=False),
+    dict(spline_segments=5, trace_step=1, min_radius=1, antialias=False),
+    dict(spline_segments=10, trace_step=1, min_radius=1, antialias=True),
+]
+
+
+class AdaptiveQuality:
+    """Pick a render level that keeps frame work inside the fps budget.
+
+    Frame times are averaged over ``window`` frames. The level drops when
+    the average exceeds ``high`` of the budget and rises when it stays
+    under ``low``; the gap between the two and a ``cooldown`` after every
+    change keep it from oscillating. Stepping back down within ``trial``
+    frames of a step up doubles the wait before the next attempt to go
+    up, to at most ``max_hold`` frames. A step up that lasts the trial
+    resets the wait, so occasional slow frames do not add up.
+    """
+
+    def __init__(self, fps, levels=LEVELS, window=30, cooldown=60,
+                 low=0.5, high=0.85, trial=180, max_hold=960):
+        self.levels = levels
+        self.level = len(levels) // 2
+        self.budget = 1000 / fps
+        self.window = window
+        self.cooldown = cooldown
+        self.low = low
+        self.high = high
+        self.trial = trial
+        self.max_hold = max_hold
+        self._times = deque(maxlen=window)
+        self._wait = cooldown
+        self._hold = cooldown
+        self._raise_wait = cooldown
+        self._since_raise = None  # Frames the last step up has lasted
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def record(self, frame_ms):
+        """Add one frame's work time, return True if the level changed."""
+        self._times.append(frame_ms)
+        self._raise_wait = max(0, self._raise_wait - 1)
+        if self._since_raise is not None:
+            self._since_raise += 1
+            if self._since_raise > self.trial:
+                # The step up held, start over from the shortest wait
+                self._since_raise = None
+                self._hold = self.cooldown
+        if self._wait > 0:
+            self._wait -= 1
+            return False
+        if len(self._times) < self.window:
+            return False
+
+        average = sum(self._times) / len(self._times)
+        if average > self.high * self.budget and self.level > 0:
+            self.level -= 1
+            if self._since_raise is not None:
+                self._hold = min(2 * self._hold, self.max_hold)
+            self._since_raise = None
+            self._raise_wait = self._hold
+            self._settle()
+            return True
+        can_rise = self._raise_wait == 0 and self.level < len(self.levels) - 1
+        if average < self.low * self.budget and can_rise:
+            self.level += 1
+            self._since_raise = 0
+            self._settle()
+            return True
+        return False
+
+    def _settle(self):
+        self._times.clear()
+        self._wait = self.cooldown
@@ -0,0 +1,63 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity history of floats, newest value first.
+
+    Every value is written twice, ``capacity`` slots apart, so the
+    ordered contents are always one contiguous slice of the storage and
+    ``view()`` never has to copy.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def push(self, value):
+        self._head = (self._head - 1) % self.capacity
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def resize(self, capacity):
+        """Empty the buffer, reallocating only if the capacity changed."""
+        capacity = max(1, int(capacity))
+        if capacity != self.capacity:
+            self.__init__(capacity, self._data.dtype)
+        else:
+            self.clear()
+
+    def view(self):
+        """Return the contents, newest first, as a read-only array view."""
+        view = self._data[self._head:self._head + self._size]
+        view.flags.writeable = False
+        return view
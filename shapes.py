@@ -0,0 +1,392 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from itertools import islice
+
+import numpy as np
+
+import analysis
+
+CHUNK = 65536  # Points parsed, flattened or resampled at a time
+MAX_SAMPLES = 65536  # Points along the outline that get analysed
+CURVE_TOLERANCE = 2  # Longest flattened curve segment, in SVG user units
+MAX_CURVE_SEGMENTS = 64
+CACHE_VERSION = 1  # Change when the analysis changes its results
+
+_TOKEN = re.compile(r"([MmZzLlHhVvCcSsQqTtAa])|"
+                    r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+_ARITY = dict(M=2, L=2, H=1, V=1, C=6, S=4, Q=4, T=2, A=7)
+
+
+def load(path, count, cache_dir=None):
+    """Return the ``count`` largest terms of the outline in ``path``.
+
+    The result is ``(centre, coefficients, harmonics)`` like
+    analysis.complex_series. With a ``cache_dir`` the terms are stored
+    under a hash of the file contents, so loading the same shape again
+    skips the parsing and the analysis.
+    """
+    cache = None
+    if cache_dir is not None:
+        cache = os.path.join(cache_dir, file_digest(path, count) + ".npz")
+        try:
+            with np.load(cache) as terms:
+                return (complex(terms["centre"]), terms["coefficients"],
+                        terms["harmonics"])
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            pass  # Not analysed yet, or a damaged entry to replace
+
+    points = load_points(path)
+    if len(points) < 2:
+        raise ValueError("%s has fewer than two points" % path)
+    length = max(2 * count + 1, min(len(points), MAX_SAMPLES))
+    terms = analysis.complex_spectrum(even_samples(points, length), count)
+
+    if cache is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write a whole entry or none, another load may be reading
+        temporary = cache + ".part"
+        with open(temporary, "wb") as f:
+            np.savez(f, centre=terms[0], coefficients=terms[1],
+                     harmonics=terms[2])
+        os.replace(temporary, cache)
+    return terms
+
+
+def file_digest(path, count):
+    """Hash the file contents together with the analysis parameters."""
+    digest = hashlib.sha256(b"%d %d %s\n" % (
+        CACHE_VERSION, count, file_kind(path).encode()))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_kind(path):
+    """Return "npy", "svg" or "text" by extension, or by contents.
+
+    Files from the Journal often have no extension at all.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".npy", ".svg"):
+        return extension[1:]
+    if extension in (".csv", ".txt"):
+        return "text"
+    with open(path, "rb") as f:
+        start = f.read(512)
+    if start.startswith(b"\x93NUMPY"):
+        return "npy"
+    if start.lstrip().startswith(b"<"):
+        return "svg"
+    return "text"
+
+
+def load_points(path):
+    """Return the points of an SVG, CSV or NPY file as an (n, 2) array.
+
+    ``.npy`` files are memory-mapped and may also hold a 1D complex
+    array, which is returned as it is. SVG paths, polygons and polylines
+    are joined in document order, curves flattened to lines. Anything
+    else is read as text with x and y in the first two columns,
+    separated by commas or spaces.
+    """
+    kind = file_kind(path)
+    if kind == "npy":
+        points = np.load(path, mmap_mode="r")
+        if points.ndim == 1 and np.iscomplexobj(points):
+            return points
+        if points.ndim != 2 or points.shape[1] < 2:
+            raise ValueError("%s is not a list of points" % path)
+        return points[:, :2]
+
+    if kind == "svg":
+        chunks = (_xy(chunk) for chunk in _batched(svg_points(path), CHUNK))
+        return _collect(chunks)
+    with open(path) as f:
+        return _collect(text_points(f))
+
+
+def text_points(lines, chunk=CHUNK):
+    """Yield (m, 2) arrays of the x and y columns of CSV or text lines.
+
+    A first line that does not start with a number is taken as a header.
+    """
+    lines = (line.replace(",", " ") for line in lines)
+    first = next(lines, "").strip()
+    if first and first[0] in "+-.0123456789":
+        lines = _prepend(first, lines)
+    while True:
+        block = list(islice(lines, chunk))
+        if not block:
+            return
+        points = np.loadtxt(block, usecols=(0, 1), ndmin=2)
+        if len(points):
+            yield points
+
+
+def svg_points(path):
+    """Yield the points of the shapes in an SVG file as complex numbers.
+
+    Elements are parsed one at a time and dropped once read, so the
+    document is never held in memory as a whole. Transforms are ignored.
+    """
+    try:
+        for _, element in ET.iterparse(path):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "path":
+                yield from flatten_path(element.get("d", ""))
+            elif tag in ("polygon", "polyline"):
+                first = None
+                for point in _pairs(element.get("points", "")):
+                    if first is None:
+                        first = point
+                    yield point
+                if tag == "polygon" and first is not None:
+                    yield first
+            element.clear()
+    except ET.ParseError as error:
+        raise ValueError("%s is not valid SVG: %s" % (path, error)) from error
+
+
+def flatten_path(d):
+    """Yield the points of SVG path data as complex numbers.
+
+    Bezier curves and elliptical arcs are cut into segments of at most
+    CURVE_TOLERANCE units.
+    """
+    point = start = 0j
+    control = None  # Last control point, reflected by S and T
+    previous = None
+    for command, args in _commands(d):
+        kind = command.upper()
+        origin = point if command.islower() else 0j
+        if kind == "Z":
+            point = start
+            yield point
+        elif kind == "H":
+            point = complex(args[0] + origin.real, point.imag)
+            yield point
+        elif kind == "V":
+            point = complex(point.real, args[0] + origin.imag)
+            yield point
+        elif kind in "MLT":
+            end = origin + complex(*args)
+            if kind == "T":
+                smooth = previous in ("Q", "T")
+                control = 2 * point - control if smooth else point
+                yield from _curve((point, control, end))
+            else:
+                yield end
+            if kind == "M":
+                start = end
+            point = end
+        elif kind in "CSQ":
+            points = [origin + complex(x, y)
+                      for x, y in zip(args[::2], args[1::2])]
+            if kind == "S":
+                smooth = previous in ("C", "S")
+                points.insert(0, 2 * point - control if smooth else point)
+            control = points[-2]
+            yield from _curve([point] + points)
+            point = points[-1]
+        elif kind == "A":
+            end = origin + complex(args[5], args[6])
+            yield from _arc(point, args[0], args[1], args[2],
+                            bool(args[3]), bool(args[4]), end)
+            point = end
+        previous = kind
+
+
+def even_samples(points, length):
+    """Return ``length`` points evenly spaced along the closed path.
+
+    ``points`` is an (n, 2) array or a 1D complex array. It is read
+    CHUNK points at a time, twice, so memory-mapped files are never
+    loaded whole. Returns complex numbers, starting at the first point.
+    """
+    first = _complex(points[:1])[0]
+    total = 0.0
+    last = first
+    for block in _blocks(points):
+        block = _complex(block)
+        total += abs(block[0] - last) + np.abs(np.diff(block)).sum()
+        last = block[-1]
+    total += abs(first - last)
+
+    targets = np.arange(length) * (total / length)
+    samples = np.empty(length, dtype=np.complex128)
+    done = 0
+    distance = 0.0
+    last = first
+    for block in _blocks(points):
+        path = np.concatenate(([last], _complex(block)))
+        steps = np.cumsum(np.abs(np.diff(path)))
+        along = distance + np.concatenate(([0], steps))
+        end = max(done, np.searchsorted(targets, along[-1], "right"))
+        samples[done:end] = _interp(targets[done:end], along, path)
+        done = end
+        distance = along[-1]
+        last = path[-1]
+
+    # The closing segment also takes any targets rounding left over
+    along = np.array([distance, distance + abs(first - last)])
+    samples[done:] = _interp(targets[done:], along, np.array([last, first]))
+    return samples
+
+
+def _commands(d):
+    # Yield (command, arguments) of path data, with the implied repeats
+    # of a command spelled out
+    command = None
+    args = []
+    for token in _TOKEN.finditer(d):
+        letter, number = token.groups()
+        if letter:
+            command = letter
+            args = []
+            if letter in "Zz":
+                yield letter, ()
+            continue
+        if command is None or command in "Zz":
+            raise ValueError("Path data has a number without a command")
+        args.append(float(number))
+        if len(args) == _ARITY[command.upper()]:
+            yield command, args
+            args = []
+            # More coordinates after a move are lines
+            if command in "Mm":
+                command = chr(ord(command) - 1)
+
+
+def _pairs(text):
+    # Complex numbers from a list of x and y coordinates, read lazily
+    numbers = (float(token.group(2)) for token in _TOKEN.finditer(text)
+               if token.group(2))
+    for x in numbers:
+        y = next(numbers, None)
+        if y is None:
+            return
+        yield complex(x, y)
+
+
+def _curve(points):
+    # Bezier curve through the control points, without its start
+    points = np.array(points)
+    reach = np.abs(np.diff(points)).sum()
+    segments = _segments(reach)
+    t = np.arange(1, segments + 1) / segments
+    points = np.repeat(points[:, None], segments, axis=1)
+    while len(points) > 1:
+        points = points[:-1] * (1 - t) + points[1:] * t
+    return points[0].tolist()
+
+
+def _arc(start, rx, ry, angle, large, sweep, end):
+    # Endpoint to centre conversion of the SVG specification, appendix F.6
+    rx = abs(rx)
+    ry = abs(ry)
+    if start == end:
+        return []
+    if rx == 0 or ry == 0:
+        return [end]
+    rotation = np.exp(1j * np.radians(angle))
+    half = (start - end) / 2 / rotation
+    scale = (half.real / rx) ** 2 + (half.imag / ry) ** 2
+    if scale > 1:
+        rx *= np.sqrt(scale)
+        ry *= np.sqrt(scale)
+    across = (rx * half.imag) ** 2 + (ry * half.real) ** 2
+    factor = np.sqrt(max(0.0, ((rx * ry) ** 2 - across) / across))
+    if large == sweep:
+        factor = -factor
+    centre = factor * complex(rx * half.imag / ry, -ry * half.real / rx)
+
+    first = complex((half.real - centre.real) / rx,
+                    (half.imag - centre.imag) / ry)
+    last = complex((-half.real - centre.real) / rx,
+                   (-half.imag - centre.imag) / ry)
+    sweep_angle = np.angle(last / first)
+    if sweep and sweep_angle < 0:
+        sweep_angle += 2 * np.pi
+    elif not sweep and sweep_angle > 0:
+        sweep_angle -= 2 * np.pi
+
+    segments = _segments(abs(sweep_angle) * max(rx, ry))
+    t = np.angle(first) + sweep_angle * np.arange(1, segments + 1) / segments
+    ellipse = complex(rx, 0) * np.cos(t) + complex(0, ry) * np.sin(t)
+    points = (centre + ellipse) * rotation
+    points += (start + end) / 2
+    points[-1] = end
+    return points.tolist()
+
+
+def _segments(reach):
+    # Enough segments to keep each within CURVE_TOLERANCE, up to a limit
+    needed = int(np.ceil(reach / CURVE_TOLERANCE))
+    return min(MAX_CURVE_SEGMENTS, max(1, needed))
+
+
+def _batched(values, size):
+    values = iter(values)
+    while True:
+        batch = list(islice(values, size))
+        if not batch:
+            return
+        yield np.array(batch, dtype=np.complex128)
+
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
+
+
+def _collect(chunks):
+    # Append the chunks to one array, doubling it when full
+    data = np.empty((CHUNK, 2))
+    size = 0
+    for chunk in chunks:
+        while size + len(chunk) > len(data):
+            data = np.concatenate((data, np.empty_like(data)))
+        data[size:size + len(chunk)] = chunk
+        size += len(chunk)
+    return data[:size]
+
+
+def _blocks(points):
+    for start in range(0, len(points), CHUNK):
+        yield points[start:start + CHUNK]
+
+
+def _interp(x, along, path):
+    real = np.interp(x, along, path.real)
+    return real + 1j * np.interp(x, along, path.imag)
+
+
+def _xy(chunk):
+    return np.column_stack((chunk.real, chunk.imag))
+
+
+def _complex(block):
+    if np.iscomplexobj(block):
+        return np.asarray(block, dtype=np.complex128).reshape(-1)
+    block = np.asarray(block, dtype=np.float64)
+    return block[:, 0] + 1j * block[:, 1]
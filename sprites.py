@@ -0,0 +1,78 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import pygame
+import pygame.gfxdraw
+
+COLORKEY = (255, 0, 255)
+
+
+class CircleAtlas:
+    """Pre-rendered circle outlines, blitted instead of drawn every frame.
+
+    Sprites are keyed by (radius, colour, width, antialias) and rendered
+    on first use. Radii are truncated to whole pixels like
+    pygame.draw.circle does, so plain outlines blit pixel for pixel the
+    same as drawing them. Call clear() when the layout or theme changes.
+    """
+
+    def __init__(self):
+        self._sprites = {}
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def clear(self):
+        self._sprites.clear()
+
+    def sprite(self, radius, color, width=1, antialias=False):
+        key = (int(radius), tuple(color), width, antialias)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._sprites[key] = _render(*key)
+        return sprite
+
+    def blit(self, surface, centre, radius, color, width=1, antialias=False):
+        """Draw a circle outline centred on ``centre``, return its Rect."""
+        radius = int(radius)
+        sprite = self.sprite(radius, color, width, antialias)
+        return surface.blit(sprite, (int(centre[0]) - radius - 1,
+                                     int(centre[1]) - radius - 1))
+
+
+def _render(radius, color, width, antialias):
+    size = 2 * radius + 3
+    centre = (radius + 1, radius + 1)
+    if not antialias:
+        # Run-length encoded colour key blits skip the empty inside quickly
+        sprite = pygame.Surface((size, size)).convert()
+        sprite.fill(COLORKEY)
+        sprite.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        pygame.draw.circle(sprite, color, centre, radius, width)
+        return sprite
+
+    # Draw the coverage in white on black and use it as the alpha channel
+    mask = pygame.Surface((size, size))
+    white = (255, 255, 255)
+    pygame.gfxdraw.aacircle(mask, centre[0], centre[1], radius, white)
+    if width > 1:
+        pygame.draw.circle(mask, white, centre, radius, width)
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    sprite.fill(color)
+    alpha = pygame.surfarray.pixels_alpha(sprite)
+    alpha[:] = pygame.surfarray.array_red(mask)
+    del alpha  # Unlock the surface
+    return sprite.convert_alpha()
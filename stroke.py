@@ -0,0 +1,101 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import pygame
+
+
+class StrokeRecorder:
+    """Every pointer sample of the current stroke as x, y and time in ms.
+
+    A stroke starts when the left button is pressed and ends when it is
+    released. Under Sugar the event translator records straight from the
+    GTK callbacks and sets ``hooked``; otherwise FourierSim feeds it the
+    pygame events with ``record_event()``.
+    """
+
+    def __init__(self, capacity=4096):
+        self._data = np.empty((capacity, 3), dtype=np.float64)
+        self._size = 0
+        self.active = False
+        self.hooked = False
+        self.count = 0  # Samples recorded so far, for change detection
+        self.strokes = 0  # Strokes begun so far
+
+    def __len__(self):
+        return self._size
+
+    def begin(self, x, y, time):
+        self._size = 0
+        self.active = True
+        self.strokes += 1
+        self.add(x, y, time)
+
+    def add(self, x, y, time):
+        if not self.active:
+            return
+        if self._size == len(self._data):
+            grown = np.empty_like(self._data)
+            self._data = np.concatenate((self._data, grown))
+        self._data[self._size] = (x, y, time)
+        self._size += 1
+        self.count += 1
+
+    def end(self, x, y, time):
+        self.add(x, y, time)
+        self.active = False
+
+    def clear(self):
+        self._size = 0
+        self.active = False
+        self.count += 1
+
+    def samples(self):
+        """Return the samples as a read-only (n, 3) array view."""
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def record_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.begin(*event.pos, pygame.time.get_ticks())
+        elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+            self.add(*event.pos, pygame.time.get_ticks())
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.end(*event.pos, pygame.time.get_ticks())
+
+
+def resample(samples, start, width):
+    """Return the stroke's y on every pixel column it covers.
+
+    Only samples with ``start <= x <= start + width`` are used. Returns
+    the first column and the y values, or None if fewer than two samples
+    are in range.
+    """
+    x = samples[:, 0]
+    inside = (x >= start) & (x <= start + width)
+    x = x[inside]
+    y = samples[inside, 1]
+    if len(x) < 2:
+        return None
+
+    order = np.argsort(x, kind="stable")
+    x = x[order]
+    y = y[order]
+    columns = np.arange(np.ceil(x[0]), np.floor(x[-1]) + 1)
+    if len(columns) < 2:
+        return None
+    return int(columns[0]), np.interp(columns, x, y)
@@ -20,6 +20,7 @@
 # SOFTWARE.
 #
 
+import io
 import os
 from gi.repository import Gtk
 from gi.repository import GLib
@@ -44,6 +45,7 @@ class PygameCanvas(Gtk.EventBox):
         self._activity = activity
         self._main = main
         self._modules = modules
+        self._preview = None
 
         self.set_can_focus(True)
 
@@ -70,11 +72,29 @@ class PygameCanvas(Gtk.EventBox):
 
         # Hook certain Pygame functions with GTK equivalents.
         self.translator.hook_pygame()
+        self._hook_display()
 
         # Call the caller's main loop as an idle source
         if self._main:
             GLib.idle_add(self._main)
 
+    def _hook_display(self):
+        # Any screen update makes the cached preview stale
+        update = pygame.display.update
+        flip = pygame.display.flip
+
+        def _update(*args):
+            if not args or args[0]:
+                self._preview = None
+            return update(*args)
+
+        def _flip():
+            self._preview = None
+            return flip()
+
+        pygame.display.update = _update
+        pygame.display.flip = _flip
+
     def get_pygame_widget(self):
         return self._socket
 
@@ -89,18 +109,13 @@ class PygameCanvas(Gtk.EventBox):
         if not hasattr(self, '_screen'):
             return None
 
-        _tmp_dir = os.path.join(self._activity.get_activity_root(),
-                                'tmp')
-        _file_path = os.path.join(_tmp_dir, 'preview.png')
-
-        width = PREVIEW_SIZE[0]
-        height = PREVIEW_SIZE[1]
-        _surface = pygame.transform.scale(self._screen, (width, height))
-        pygame.image.save(_surface, _file_path)
-
-        f = open(_file_path, 'rb')
-        preview = f.read()
-        f.close()
-        os.remove(_file_path)
+        # Encoded in memory and reused until the screen changes again
+        if self._preview is None:
+            width = PREVIEW_SIZE[0]
+            height = PREVIEW_SIZE[1]
+            _surface = pygame.transform.scale(self._screen, (width, height))
+            _buffer = io.BytesIO()
+            pygame.image.save(_surface, _buffer, 'preview.png')
+            self._preview = _buffer.getvalue()
 
-        return preview
\ No newline at end of file
+        return self._preview
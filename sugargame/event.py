@@ -212,7 +212,6 @@ class Translator(object):
 
         self._inner_evb.set_events(
             Gdk.EventMask.POINTER_MOTION_MASK |
-            Gdk.EventMask.POINTER_MOTION_HINT_MASK |
             Gdk.EventMask.BUTTON_MOTION_MASK |
             Gdk.EventMask.BUTTON_PRESS_MASK |
             Gdk.EventMask.BUTTON_RELEASE_MASK
@@ -231,22 +230,52 @@ class Translator(object):
         self._inner_evb.connect('button-release-event', self._mouseup_cb)
         self._inner_evb.connect('motion-notify-event', self._mousemove_cb)
         self._inner_evb.connect('screen-changed', self._screen_changed_cb)
+        self._inner_evb.connect('realize', self._realize_cb)
 
         # Internal data
         self.__button_state = [0, 0, 0]
         self.__mouse_pos = (0, 0)
         self.__repeat = (None, None)
         self.__held = set()
-        self.__held_time_left = {}
-        self.__held_last_time = {}
+        self.__held_deadline = {}
         self.__tick_id = None
         self.__keystate = dict((i, False) for i in self.keys)
+        self.__pending_motion = None
+        self.__event_get = None
+
+        # Optional recorder of every pointer sample, see record_strokes()
+        self.stroke = None
+
+        # Motion notifications received and merged, events posted and
+        # events lost to a full queue
+        self.stats = {'motion': 0, 'coalesced': 0, 'posted': 0, 'dropped': 0}
 
     def hook_pygame(self):
         pygame.key.get_pressed = self._get_pressed
         pygame.key.set_repeat = self._set_repeat
         pygame.mouse.get_pressed = self._get_mouse_pressed
         pygame.mouse.get_pos = self._get_mouse_pos
+        self.__event_get = pygame.event.get
+        pygame.event.get = self._get_events
+
+    def record_strokes(self, recorder):
+        """Record every pointer sample while the left button is held.
+
+        The recorder gets begin(), add() and end() calls with x, y and
+        the GDK timestamp, straight from the GTK callbacks, so a stroke
+        keeps all of its samples even though motion events are coalesced.
+        """
+        self.stroke = recorder
+        recorder.hooked = True
+
+    def _realize_cb(self, widget):
+        # Deliver every motion sample instead of one per frame clock tick
+        widget.get_window().set_event_compression(False)
+
+    def _get_events(self, *args, **kwargs):
+        # Motion is held back until the game asks for its events
+        self._flush_motion()
+        return self.__event_get(*args, **kwargs)
 
     def update_display(self):
         if pygame.display.get_init():
@@ -267,6 +296,13 @@ class Translator(object):
         pygame.event.post(pygame.event.Event(pygame.QUIT))
 
     def _visibility_cb(self, widget, event):
+        # Tell the game whether anything of the canvas can be seen, so it
+        # can stop drawing while fully covered
+        visible = event.state != Gdk.VisibilityState.FULLY_OBSCURED
+        if pygame.display.get_init():
+            self._post(pygame.event.Event(pygame.ACTIVEEVENT,
+                                          gain=int(visible),
+                                          state=pygame.APPACTIVE))
         self.update_display()
         return False
 
@@ -276,20 +312,19 @@ class Translator(object):
             return True
         else:
             if self.__repeat[0] is not None:
-                self.__held_last_time[key] = pygame.time.get_ticks()
-                self.__held_time_left[key] = self.__repeat[0]
+                delay = self.__repeat[0]
+                self.__held_deadline[key] = pygame.time.get_ticks() + delay
+                self._schedule_repeat()
             self.__held.add(key)
 
         return self._keyevent(widget, event, pygame.KEYDOWN)
 
     def _keyup_cb(self, widget, event):
         key = event.keyval
-        if self.__repeat[0] is not None:
-            if key in self.__held:
-                # This is possibly false if set_repeat()
-                # is called with a key held
-                del self.__held_time_left[key]
-                del self.__held_last_time[key]
+        # The key may have no deadline if set_repeat()
+        # was called with it held
+        if self.__held_deadline.pop(key, None) is not None:
+            self._schedule_repeat()
         self.__held.discard(key)
 
         return self._keyevent(widget, event, pygame.KEYUP)
@@ -341,10 +376,14 @@ class Translator(object):
 
     def _mousedown_cb(self, widget, event):
         self.__button_state[event.button - 1] = 1
+        if self.stroke is not None and event.button == 1:
+            self.stroke.begin(event.x, event.y, event.time)
         return self._mouseevent(widget, event, pygame.MOUSEBUTTONDOWN)
 
     def _mouseup_cb(self, widget, event):
         self.__button_state[event.button - 1] = 0
+        if self.stroke is not None and event.button == 1:
+            self.stroke.end(event.x, event.y, event.time)
         return self._mouseevent(widget, event, pygame.MOUSEBUTTONUP)
 
     def _mouseevent(self, widget, event, type):
@@ -373,43 +412,76 @@ class Translator(object):
             state & Gdk.ModifierType.BUTTON3_MASK and 1 or 0,
         ]
 
+        if self.stroke is not None and self.__button_state[0]:
+            self.stroke.add(x, y, event.time)
+
+        # Merge motion between two frames into a single event with the
+        # latest position and the summed relative movement
+        self.stats['motion'] += 1
+        if self.__pending_motion is not None:
+            self.stats['coalesced'] += 1
+            pending_rel = self.__pending_motion[1]
+            rel = (pending_rel[0] + rel[0], pending_rel[1] + rel[1])
+        self.__pending_motion = (self.__mouse_pos, rel,
+                                 list(self.__button_state))
+        return True
+
+    def _flush_motion(self):
+        if self.__pending_motion is None:
+            return
+        pos, rel, buttons = self.__pending_motion
+        self.__pending_motion = None
         evt = pygame.event.Event(pygame.MOUSEMOTION,
-                                 pos=self.__mouse_pos, rel=rel,
-                                 buttons=self.__button_state)
+                                 pos=pos, rel=rel, buttons=buttons)
         self._post(evt)
-        return True
+
+    def _schedule_repeat(self):
+        # A single one-shot timer for the earliest repeat deadline, and
+        # none at all while no key is held
+        if self.__tick_id is not None:
+            GLib.source_remove(self.__tick_id)
+            self.__tick_id = None
+        if self.__held_deadline:
+            wait = min(self.__held_deadline.values()) - pygame.time.get_ticks()
+            self.__tick_id = GLib.timeout_add(max(0, wait), self._tick_cb)
 
     def _tick_cb(self):
+        self.__tick_id = None
         cur_time = pygame.time.get_ticks()
-        for key in self.__held:
-            delta = cur_time - self.__held_last_time[key]
-            self.__held_last_time[key] = cur_time
-
-            self.__held_time_left[key] -= delta
-            if self.__held_time_left[key] <= 0:
-                self.__held_time_left[key] = self.__repeat[1]
+        interval = self.__repeat[1] or self.__repeat[0]
+        for key, deadline in list(self.__held_deadline.items()):
+            if deadline <= cur_time:
+                # Skip repeats missed while the main loop was busy
+                self.__held_deadline[key] = max(deadline, cur_time) + interval
                 self._keyevent(None, _MockEvent(key), pygame.KEYDOWN)
 
-        return True
+        self._schedule_repeat()
+        return False
 
     def _set_repeat(self, delay=None, interval=None):
-        if delay is not None and self.__repeat[0] is None:
-            self.__tick_id = GLib.timeout_add(10, self._tick_cb)
-        elif delay is None and self.__repeat[0] is not None:
-            GLib.source_remove(self.__tick_id)
+        if not delay:
+            # Like pygame, no delay or a delay of 0 disables repeat
+            delay = interval = None
+            self.__held_deadline.clear()
+            self._schedule_repeat()
         self.__repeat = (delay, interval)
 
     def _get_mouse_pos(self):
         return self.__mouse_pos
 
     def _post(self, evt):
+        # Keep pending motion ahead of the event that followed it
+        if evt.type != pygame.MOUSEMOTION:
+            self._flush_motion()
+
         try:
             pygame.event.post(evt)
+            self.stats['posted'] += 1
         except pygame.error as e:
             if str(e) == 'video system not initialized':
                 pass
             elif str(e) == 'Event queue full':
                 logging.error("Event queue full!")
-                pass
+                self.stats['dropped'] += 1
             else:
                 raise e
\ No newline at end of file
@@ -0,0 +1,45 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+import analysis
+from stroke import resample
+
+WIDTH = 400
+
+
+def test_live_series_at_pen_up_equals_final_series():
+    # A stroke that covers part of the line and doubles back, fed a few
+    # samples at a time like the simulation view does while drawing
+    t = np.linspace(0, 1, 90)
+    xs = 40 + 250 * t - 60 * np.sin(6 * t)
+    ys = 80 * np.sin(9 * t)
+    samples = np.column_stack((xs, ys, t))
+
+    live = analysis.RunningSpectrum(WIDTH, 12)
+    fed = 0
+    for end in list(range(3, len(samples), 7)) + [len(samples)]:
+        sketch = resample(samples[max(0, fed - 1):end], 0, WIDTH)
+        fed = end
+        if sketch is None:
+            continue
+        first, heights = sketch
+        offsets = np.arange(first, first + len(heights))
+        live.set(WIDTH - 1 - offsets, heights)
+
+    final = analysis.fourier_series(live.values.copy(), 12)
+    for live_part, final_part in zip(live.series(), final):
+        assert np.allclose(live_part, final_part)
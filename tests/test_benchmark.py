@@ -0,0 +1,67 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+
+import benchmark
+
+CASE = {
+    "circles": 8,
+    "quality": 1,
+    "dark": False,
+    "show_help": False,
+    "show_coefficients": True,
+}
+
+
+def test_run_case_times_every_stage(display):
+    result = benchmark.run_case(CASE, frames=5, warmup=2)
+    assert math.isfinite(result["frame"]["mean_ms"])
+    for name, stage in result["stages"].items():
+        assert math.isfinite(stage["per_frame_ms"]), name
+        assert math.isfinite(stage["per_call_ms"]), name
+    assert result["stages"]["epicycles"]["calls"] > 0
+    assert result["stages"]["epicycles"]["per_frame_ms"] > 0
+
+
+def test_run_case_times_the_cached_ui(display):
+    result = benchmark.run_case(CASE, frames=5, warmup=2)
+    for name in benchmark.UI_STAGES:
+        assert result["stages"][name]["calls"] == 5, name
+        assert result["stages"][name]["per_frame_ms"] > 0, name
+
+
+def test_compare_flags_slower_stages():
+    def results(p50_ms):
+        stage = {"per_frame_ms": 0.0, "per_call_ms": p50_ms,
+                 "p50_ms": p50_ms, "calls": 1}
+        return {"cases": {"case": {"frame": {"p50_ms": 5.0},
+                                   "stages": {"draw_controls": stage}}}}
+
+    regressions = benchmark.compare(results(2.0), results(1.0), 0.2, 0.25)
+    assert len(regressions) == 1
+    assert "draw_controls" in regressions[0]
+    assert not benchmark.compare(results(1.0), results(1.0), 0.2, 0.25)
+
+
+def test_identical_runs_have_no_regressions(display):
+    args = benchmark.parse_args([])
+    results = []
+    for _ in range(2):
+        runs = [benchmark.run_case(CASE, args.frames, args.warmup)
+                for _ in range(args.repeat)]
+        results.append({"cases": {"case": benchmark.best_run(runs)}})
+    assert not benchmark.compare(results[1], results[0], args.threshold,
+                                 args.floor)
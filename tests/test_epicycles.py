@@ -0,0 +1,84 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+import epicycles
+
+
+def series(count, seed=0):
+    rng = np.random.default_rng(seed)
+    coefficients = rng.normal(size=count) + 1j * rng.normal(size=count)
+    return coefficients, np.arange(1, count + 1, dtype=np.float64)
+
+
+def test_path_cache_evicts_least_recently_used_within_bytes():
+    table_bytes = 64 * 2 * 16
+    cache = epicycles.PathCache(max_bytes=3 * table_bytes)
+    columns = np.array([0, 4])
+    shapes = [series(4, seed) for seed in range(4)]
+
+    tables = [cache.get(*shape, columns, 64) for shape in shapes[:3]]
+    assert cache.get(*shapes[0], columns, 64) is tables[0]  # Now most recent
+    cache.get(*shapes[3], columns, 64)
+
+    assert len(cache) == 3
+    assert cache.nbytes == 3 * table_bytes
+    assert cache.get(*shapes[0], columns, 64) is tables[0]
+    assert cache.get(*shapes[2], columns, 64) is tables[2]
+    # The second table was the least recently used, so it was rebuilt
+    assert cache.get(*shapes[1], columns, 64) is not tables[1]
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_path_cache_skips_tables_over_the_limits():
+    coefficients, harmonics = series(8)
+    columns = np.arange(9)
+    cache = epicycles.PathCache(max_table_bytes=1024 * 9 * 16 - 1)
+    assert cache.get(coefficients, harmonics, columns, 1024) is None
+    assert cache.get(coefficients, harmonics, columns[-1:], 1024) is not None
+
+    cache = epicycles.PathCache(max_work=1024 * 9 - 1)
+    assert cache.get(coefficients, harmonics, columns[-1:], 1024) is None
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_path_table_matches_direct_evaluation():
+    coefficients, harmonics = series(16)
+    table = epicycles.PathTable(coefficients, harmonics, [16], 600)
+    time = 2 * np.pi * 37 / 600
+    _, tips = epicycles.evaluate(coefficients, harmonics, time, 0j)
+    assert np.allclose(table.at(time)[0], tips[0])
+
+
+def test_level_of_detail_folds_every_small_circle_into_the_tail():
+    coefficients = np.array([5, 0.1j, 3, -0.2, 0.05, 2j])
+    harmonics = np.arange(1, 7, dtype=np.float64)
+    order, drawn = epicycles.level_of_detail(coefficients, 1)
+    assert order.tolist() == [0, 2, 5, 1, 3, 4]
+    assert drawn == 3
+
+    # Chained in that order the drawn circles are contiguous and the
+    # tail still ends at the tip
+    time = 0.7
+    centres, tips = epicycles.evaluate(coefficients[order],
+                                       harmonics[order], time)
+    _, expected = epicycles.evaluate(coefficients, harmonics, time)
+    assert np.allclose(tips, expected)
+    tail = tips[0] - centres[0, drawn]
+    small = order[drawn:]
+    phasors = coefficients[small] * np.exp(1j * harmonics[small] * time)
+    assert np.isclose(tail, phasors.sum())
+    assert abs(tail) < 1
@@ -0,0 +1,63 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pygame
+
+from main import FourierSim
+
+
+class ManualClock:
+    """Clock whose time only moves when the test says so."""
+
+    def __init__(self):
+        self.now = 0
+        self._last_tick = 0
+        self._last = 0
+
+    def tick(self, framerate=0):
+        self._last = self.now - self._last_tick
+        self._last_tick = self.now
+        return self._last
+
+    def get_time(self):
+        return self._last
+
+    def get_rawtime(self):
+        return self._last
+
+    def get_fps(self):
+        return 0.0
+
+
+def test_waking_up_does_not_catch_up_on_the_wait(display):
+    clock = ManualClock()
+    fourier = FourierSim(clock=clock)
+    fourier.setup()
+    steps = []
+    fourier.fixed_update_function = lambda: steps.append(clock.now)
+
+    def frames(count):
+        for _ in range(count):
+            clock.now += 1000 // fourier.config.sim_rate
+            fourier.frame()
+
+    frames(5)
+    before = len(steps)
+    # Blocked for two seconds in wait(), woken by an event
+    clock.now += 2000
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    fourier.wait()
+    frames(3)
+    assert len(steps) - before <= 3
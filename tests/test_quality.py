@@ -0,0 +1,42 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from quality import AdaptiveQuality
+
+FAST_MS = 2
+SLOW_MS = 20
+
+
+def test_occasional_spikes_do_not_hold_quality_down():
+    quality = AdaptiveQuality(60)
+    top = len(quality.levels) - 1
+    for _ in range(10):
+        for _ in range(600):
+            quality.record(FAST_MS)
+        assert quality.level == top
+        for _ in range(40):
+            quality.record(SLOW_MS)
+        assert quality.level < top
+
+
+def test_failed_steps_up_wait_longer_up_to_a_limit():
+    # Levels above 2 are too slow, level 2 is comfortably fast
+    quality = AdaptiveQuality(60)
+    holds = []
+    for _ in range(20000):
+        quality.record(SLOW_MS if quality.level > 2 else FAST_MS)
+        holds.append(quality._hold)
+    assert max(holds) == quality.max_hold
+    assert holds.index(quality.max_hold) > 4 * quality.cooldown
@@ -0,0 +1,141 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import numpy as np
+import pytest
+
+import shapes
+
+SQUARE = "M0 0 L10 0 L10 10 L0 10 Z"
+
+
+def path(d):
+    return np.array(list(shapes.flatten_path(d)))
+
+
+def test_relative_commands_start_from_the_current_point():
+    assert np.allclose(path("M10 10 l10 0 v10 h-10 z"),
+                       path("M10 10 L20 10 V20 H10 Z"))
+    # Coordinates after a move are lines, relative after a relative move
+    assert np.allclose(path("m5 5 10 0 0 10"), path("M5 5 L15 5 L15 15"))
+
+
+def test_smooth_curves_reflect_the_last_control_point():
+    assert np.allclose(path("M0 0 C0 10 10 10 10 0 S20 -10 20 0"),
+                       path("M0 0 C0 10 10 10 10 0 C10 -10 20 -10 20 0"))
+    assert np.allclose(path("M0 0 Q5 10 10 0 T20 0"),
+                       path("M0 0 Q5 10 10 0 Q15 -10 20 0"))
+    # Without a curve before them the control point is the current point
+    assert np.allclose(path("M0 0 S10 10 20 0"),
+                       path("M0 0 C0 0 10 10 20 0"))
+    assert np.allclose(path("M0 0 L5 0 T20 0"),
+                       path("M0 0 L5 0 Q5 0 20 0"))
+
+
+def test_arcs_follow_the_ellipse():
+    for sweep in (False, True):
+        points = np.array(shapes._arc(0j, 10, 10, 0, False, sweep, 20))
+        assert np.allclose(np.abs(points - 10), 10)
+        assert points[-1] == 20
+        # A positive sweep turns from +x towards +y, over the top on screen
+        side = np.sign(points[len(points) // 2].imag)
+        assert side == (-1 if sweep else 1)
+    # Radii too small to reach the end are scaled up to fit
+    points = np.array(shapes._arc(0j, 1, 1, 0, False, True, 20))
+    assert np.allclose(np.abs(points - 10), 10)
+    assert shapes._arc(0j, 0, 10, 0, False, True, 20) == [20]
+    assert shapes._arc(5j, 10, 10, 0, False, True, 5j) == []
+
+
+def test_even_samples_space_points_along_the_closed_path(monkeypatch):
+    corners = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=float)
+    expected = [0, 5, 10, 10 + 5j, 10 + 10j, 5 + 10j, 10j, 5j]
+    assert np.allclose(shapes.even_samples(corners, 8), expected)
+    complex_corners = corners[:, 0] + 1j * corners[:, 1]
+    assert np.allclose(shapes.even_samples(complex_corners, 8), expected)
+
+    # Reading in blocks gives the same samples as reading at once
+    t = np.linspace(0, 2 * np.pi, 500, endpoint=False)
+    wobbly = np.column_stack((np.cos(t), np.sin(3 * t)))
+    whole = shapes.even_samples(wobbly, 97)
+    monkeypatch.setattr(shapes, "CHUNK", 7)
+    assert np.allclose(shapes.even_samples(wobbly, 97), whole)
+
+
+def test_bad_input_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        list(shapes.flatten_path("10 10 L20 20"))
+
+    broken = tmp_path / "broken.svg"
+    broken.write_text("<svg><path d='M0 0 L1 1'></svg>")
+    with pytest.raises(ValueError):
+        shapes.load_points(str(broken))
+
+    flat = tmp_path / "flat.npy"
+    np.save(flat, np.zeros(10))
+    with pytest.raises(ValueError):
+        shapes.load_points(str(flat))
+
+    single = tmp_path / "single.csv"
+    single.write_text("x,y\n1,2\n")
+    with pytest.raises(ValueError):
+        shapes.load(str(single), 4)
+
+
+def test_files_are_read_by_contents_as_well_as_extension(tmp_path):
+    svg = tmp_path / "shape"
+    svg.write_text('<svg xmlns="http://www.w3.org/2000/svg">'
+                   '<polygon points="0,0 10,0 10,10"/>'
+                   '<path d="%s"/></svg>' % SQUARE)
+    points = shapes.load_points(str(svg))
+    assert np.allclose(points[:4], [[0, 0], [10, 0], [10, 10], [0, 0]])
+    assert np.allclose(points[4:], [[0, 0], [10, 0], [10, 10], [0, 10],
+                                    [0, 0]])
+
+    text = tmp_path / "points.txt"
+    text.write_text("x y\n0 0\n10 0\n10 10\n")
+    assert np.allclose(shapes.load_points(str(text)),
+                       [[0, 0], [10, 0], [10, 10]])
+
+
+def test_load_reuses_the_cached_terms(tmp_path, monkeypatch):
+    source = tmp_path / "square.csv"
+    source.write_text("0,0\n10,0\n10,10\n0,10\n")
+    cache = tmp_path / "cache"
+    terms = shapes.load(str(source), 4, str(cache))
+    assert len(os.listdir(cache)) == 1
+
+    def unexpected(path):
+        raise AssertionError("analysed %s again" % path)
+
+    monkeypatch.setattr(shapes, "load_points", unexpected)
+    cached = shapes.load(str(source), 4, str(cache))
+    assert cached[0] == terms[0]
+    assert np.array_equal(cached[1], terms[1])
+    assert np.array_equal(cached[2], terms[2])
+    monkeypatch.undo()
+
+    # Other contents, another term count or a damaged entry miss
+    source.write_text("0,0\n20,0\n20,20\n0,20\n")
+    assert np.allclose(abs(shapes.load(str(source), 4, str(cache))[1]),
+                       2 * abs(terms[1]))
+    shapes.load(str(source), 3, str(cache))
+    assert len(os.listdir(cache)) == 3
+    for name in os.listdir(cache):
+        (cache / name).write_bytes(b"not an archive")
+    fresh = shapes.load(str(source), 3)
+    assert np.allclose(shapes.load(str(source), 3, str(cache))[1], fresh[1])
@@ -0,0 +1,138 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pygame
+
+import headless
+from main import FourierSim
+
+
+def click(monkeypatch, pos):
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: pos)
+    for kind in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        pygame.event.post(pygame.event.Event(kind, button=1, pos=pos))
+
+
+def full_updates(monkeypatch, fourier, frames):
+    updates = []
+    update = pygame.display.update
+
+    def counting_update(*rects):
+        if not rects:
+            updates.append(True)
+        return update(*rects)
+
+    monkeypatch.setattr(pygame.display, "update", counting_update)
+    for _ in range(frames):
+        fourier.frame()
+    monkeypatch.setattr(pygame.display, "update", update)
+    return len(updates)
+
+
+def test_clicking_the_canvas_keeps_dirty_rect_updates(display, monkeypatch):
+    fourier = FourierSim(clock=headless.VirtualClock())
+    fourier.setup()
+    for _ in range(3):
+        fourier.frame()
+
+    click(monkeypatch, (display.get_width() // 2, display.get_height() - 20))
+    assert full_updates(monkeypatch, fourier, 3) == 0
+
+    # A control that changes a label still redraws the UI layer
+    help_button = (int(display.get_width() * 0.75) + 10,
+                   int(display.get_height() * 0.05) + 10)
+    click(monkeypatch, help_button)
+    assert full_updates(monkeypatch, fourier, 3) == 1
+
+
+def view_variable(fourier, name):
+    # Read the simulation view's state from the closures of its functions
+    functions = [fourier.update_function]
+    while functions:
+        function = functions.pop()
+        code = function.__code__
+        for cell_name, cell in zip(code.co_freevars, function.__closure__):
+            if cell_name == name:
+                return cell.cell_contents
+            if callable(cell.cell_contents) and hasattr(
+                    cell.cell_contents, "__closure__"):
+                if cell.cell_contents.__closure__:
+                    functions.append(cell.cell_contents)
+    raise KeyError(name)
+
+
+def retraced(fourier, sketch):
+    # How far the trace of one period is from the sketch, at the best
+    # alignment, as the trace scrolls
+    for _ in range(len(sketch)):
+        fourier.fixed_update_function()
+    centre = view_variable(fourier, "CENTER_Y")
+    trace = view_variable(fourier, "wave").view() - centre
+    expected = sketch - sketch.mean()
+    count = min(len(trace), len(sketch))
+    shifts = np.arange(count)[:, None] + np.arange(len(sketch))
+    offsets = trace[:count, None] - expected[shifts % len(sketch)]
+    return np.abs(offsets).max(axis=0).min()
+
+
+def test_the_trace_retraces_the_sketch(display, monkeypatch):
+    fourier = FourierSim(clock=headless.VirtualClock())
+    fourier.setup()
+    fourier.frame()
+    drawing_button = (int(display.get_width() * 0.65) + 10,
+                      int(display.get_height() * 0.05) + 10)
+    click(monkeypatch, drawing_button)
+    for _ in range(3):
+        fourier.frame()
+
+    # One period across the whole line, lopsided so a mirrored or
+    # squeezed trace does not line up at any shift
+    line_x = view_variable(fourier, "LINE_X")
+    width = view_variable(fourier, "LINE_W")
+    centre = view_variable(fourier, "CENTER_Y")
+    columns = np.arange(width)
+    turn = 2 * np.pi * columns / width
+    sketch = 60 * np.sin(turn) + 30 * np.sin(2 * turn) + 20
+    points = [(line_x + x, centre + y) for x, y in zip(columns, sketch)]
+    monkeypatch.setattr(pygame.mouse, "get_pressed", lambda *_: (1, 0, 0))
+    pygame.event.post(pygame.event.Event(
+        pygame.MOUSEBUTTONDOWN, button=1, pos=points[0]))
+    for point in points[1::8] + points[-1:]:
+        pygame.event.post(pygame.event.Event(
+            pygame.MOUSEMOTION, pos=point, rel=(0, 0), buttons=(1, 0, 0)))
+    fourier.frame()
+    fourier.frame()
+    assert retraced(fourier, sketch) < 2
+
+    monkeypatch.setattr(pygame.mouse, "get_pressed", lambda *_: (0, 0, 0))
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: points[-1])
+    pygame.event.post(pygame.event.Event(
+        pygame.MOUSEBUTTONUP, button=1, pos=points[-1]))
+    fourier.frame()
+    fourier.frame()
+    assert retraced(fourier, sketch) < 2
+
+
+def test_a_2d_figure_does_not_trace_the_wave(display):
+    fourier = FourierSim(clock=headless.VirtualClock())
+    fourier.setup()
+    circle = (600 + 500j, np.array([100 + 0j]), np.array([1.0]))
+    pygame.event.post(pygame.event.Event(fourier.shape_event, terms=circle))
+    for _ in range(3):
+        fourier.frame()
+    for _ in range(10):
+        fourier.fixed_update_function()
+    assert len(view_variable(fourier, "wave")) == 0
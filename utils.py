@@ -14,7 +14,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import numpy as np
 import pygame
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 def scale_image_maintain_ratio(img, w=None, h=None):
@@ -51,16 +53,127 @@ def rotate_by_center(image, angle, x, y):
 def lerp(p1, p2, t):
     return (1 - t) * p1[0] + t * p2[0], (1 - t) * p1[1] + t * p2[1]
 
-def draw_catmull_rom_spline(screen, points, offset = 0, color=(255, 255, 255), num_segments=100,):
-    for i in range(1, len(points) - 2):
-        x0, x1, x2, x3 = offset + i - 1, offset + i, offset + i + 1, offset + i + 2
-        y0, y1, y2, y3 = points[i-1], points[i], points[i+1], points[i+2]
-        for t in range(num_segments):
-            t /= num_segments
-            t2 = t * t
-            t3 = t2 * t
 
-            x = 0.5 * (2*x1 + (-x0 + x2)*t + (2*x0 - 5*x1 + 4*x2 - x3)*t2 + (-x0 + 3*x1 - 3*x2 + x3)*t3)
-            y = 0.5 * (2*y1 + (-y0 + y2)*t + (2*y0 - 5*y1 + 4*y2 - y3)*t2 + (-y0 + 3*y1 - 3*y2 + y3)*t3)
-
-            pygame.draw.circle(screen, color, (int(x), int(y)), 1)
+def catmull_rom_points(points, offset=0, num_segments=100, spacing=1):
+    """Sample a Catmull-Rom spline through evenly spaced y values.
+
+    Point ``i`` sits at ``x = offset + i * spacing``. All segments are
+    evaluated at once as a (segments x 4) window of control points times
+    the (4 x num_segments) cubic basis. Returns the x and y arrays.
+    """
+    y = np.asarray(points, dtype=np.float64)
+    if len(y) < 4 or num_segments <= 0:
+        return np.zeros(0), np.zeros(0)
+
+    t = np.arange(num_segments) / num_segments
+    t2 = t * t
+    t3 = t2 * t
+    basis = 0.5 * np.array([
+        -t + 2 * t2 - t3,
+        2 - 5 * t2 + 3 * t3,
+        t + 4 * t2 - 3 * t3,
+        -t2 + t3,
+    ])
+
+    x = offset + np.arange(len(y), dtype=np.float64) * spacing
+    xs = sliding_window_view(x, 4) @ basis
+    ys = sliding_window_view(y, 4) @ basis
+    return xs.ravel(), ys.ravel()
+
+
+def draw_catmull_rom_spline(screen, points, offset=0, color=(255, 255, 255),
+                            num_segments=100, spacing=1, thickness=2,
+                            antialias=False):
+    """Draw the spline and return the Rect it covers, like pygame.draw."""
+    xs, ys = catmull_rom_points(points, offset, num_segments, spacing)
+    return draw_points(screen, xs, ys, color, thickness, antialias)
+
+
+def draw_points(screen, xs, ys, color, thickness=2, antialias=False):
+    """Rasterise many points in one pass over the screen's pixel array.
+
+    Each point is a ``thickness`` pixels wide square; thickness 2 matches
+    pygame.draw.circle with radius 1. With ``antialias`` the square sits
+    at the point's fractional position instead, so it covers
+    ``thickness + 1`` pixels each way: those inside fully and those on
+    the edges by the fraction the square overlaps them. The coverage of
+    all points is summed per pixel, capped at 1 and used as the alpha
+    the colour is blended in with. Returns the Rect the points cover.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if len(xs) == 0:
+        return pygame.Rect(0, 0, 0, 0)
+    low = -(thickness // 2)
+    offsets = range(low, low + thickness)
+    bounds = pygame.Rect(int(xs.min()) + low, int(ys.min()) + low,
+                         int(xs.max()) - int(xs.min()) + thickness + 1,
+                         int(ys.max()) - int(ys.min()) + thickness + 1)
+
+    try:
+        if antialias:
+            return _blend_points(screen, xs, ys, color, offsets, bounds)
+        pixels = pygame.surfarray.pixels2d(screen)
+    except (ValueError, pygame.error):
+        # Surfaces without a pixel view fall back to drawing squares
+        corners = zip(xs.astype(np.int64).tolist(),
+                      ys.astype(np.int64).tolist())
+        for x, y in corners:
+            square = (x + low, y + low, thickness, thickness)
+            pygame.draw.rect(screen, color, square)
+        return bounds
+
+    xs = xs.astype(np.int64)
+    ys = ys.astype(np.int64)
+    clip = screen.get_clip()
+    mapped = screen.map_rgb(color)
+    for dx in offsets:
+        for dy in offsets:
+            px = xs + dx
+            py = ys + dy
+            inside_x = (px >= clip.left) & (px < clip.right)
+            inside_y = (py >= clip.top) & (py < clip.bottom)
+            inside = inside_x & inside_y
+            pixels[px[inside], py[inside]] = mapped
+    del pixels
+    return bounds
+
+
+def _blend_points(screen, xs, ys, color, offsets, bounds):
+    area = bounds.clip(screen.get_clip())
+    if not area.width or not area.height:
+        return bounds
+
+    # A square of width w with bilinear weights covers w + 1 pixels in
+    # each direction, fractionally at both ends
+    fx = np.floor(xs)
+    fy = np.floor(ys)
+    wx = xs - fx
+    wy = ys - fy
+    span = len(offsets)
+    steps = np.arange(span + 1)
+    ones = np.ones((1, span + 1))
+    last = steps == span
+    first = steps == 0
+    wcol = ones - last * (1 - wx)[:, None] - first * wx[:, None]
+    wrow = ones - last * (1 - wy)[:, None] - first * wy[:, None]
+    weights = (wcol[:, :, None] * wrow[:, None, :]).ravel()
+    base_x = fx.astype(np.int64) + offsets[0] - area.x
+    base_y = fy.astype(np.int64) + offsets[0] - area.y
+    px = np.repeat(base_x[:, None] + steps, span + 1, axis=1).ravel()
+    py = np.tile(base_y[:, None] + steps, (1, span + 1)).ravel()
+
+    inside = (px >= 0) & (px < area.width) & (py >= 0) & (py < area.height)
+    coverage = np.bincount(px[inside] * area.height + py[inside],
+                           weights[inside], area.width * area.height)
+    # Blend only the pixels the points touch
+    touched = np.flatnonzero(coverage)
+    alpha = np.minimum(coverage[touched], 1)[:, None]
+    tx = touched // area.height + area.x
+    ty = touched % area.height + area.y
+
+    pixels = pygame.surfarray.pixels3d(screen)
+    old = pixels[tx, ty]
+    pixels[tx, ty] = old + (np.asarray(color[:3]) - old) * alpha
+    del pixels
+    return bounds
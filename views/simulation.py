@@ -14,20 +14,29 @@
 # along with this program. If not, see .
 
 import pygame
-from math import sin, cos, pi, sqrt
+import numpy as np
+from math import sin, cos, pi
 import utils
+import epicycles
+import analysis
+import waveforms
+from ringbuffer import RingBuffer
+from stroke import resample
+from quality import AdaptiveQuality
+from sprites import CircleAtlas
+
 
 def view(game):
     vw = game.vw
     vh = game.vh
     screen = game.gameDisplay
     font = game.font
-    width = vw(100)
-    height = vh(100)
-    
+    profiler = game.profiler
+
     # Colors - now dependent on theme
     def update_colors():
-        nonlocal TEXT_COLOR, BUTTON_COLOR, CIRCLE_COLOR, BG_COLOR, WAVE_COLOR, HIGHLIGHT_COLOR
+        nonlocal TEXT_COLOR, BUTTON_COLOR, CIRCLE_COLOR, BG_COLOR
+        nonlocal WAVE_COLOR, HIGHLIGHT_COLOR
         if game.config.dark:
             TEXT_COLOR = (255, 255, 255)
             BUTTON_COLOR = (80, 80, 80)
@@ -42,7 +51,7 @@ def view(game):
             BG_COLOR = (240, 240, 245)
             WAVE_COLOR = (100, 100, 120)
             HIGHLIGHT_COLOR = (180, 180, 220)
-    
+
     # Initial color setup
     TEXT_COLOR = (0, 0, 0)
     BUTTON_COLOR = (140, 140, 140)
@@ -51,10 +60,10 @@ def view(game):
     WAVE_COLOR = (100, 100, 120)
     HIGHLIGHT_COLOR = (180, 180, 220)
     update_colors()
-    
+
     BTN_W = vw(6)
     BTN_H = vh(5)
-    
+
     CIRCLE_COLORS = [
         (160, 0, 200),
         (135, 206, 235),
@@ -67,311 +76,721 @@ def view(game):
         (200, 200, 100),
         (150, 200, 150),
     ]
-    
+
     MAX_RADIUS = vw(10)
     STROKE_WIDTH = 2
-    PLUS = font.lg.render(f"+", True, TEXT_COLOR)
-    MINUS = font.lg.render(f"-", True, TEXT_COLOR)
+    MAX_CIRCLES = game.config.max_circles
+    MIN_DRAWN_RADIUS = 1  # Smaller circles are folded into one tail vector
+    MAX_BARS = 15
+    # Long series only line up this far for an instant, don't lay out for it
+    MAX_LAYOUT_RADIUS = MAX_RADIUS * 3
     SPEED_STEP = 1 / 800
-    
+
     # State variables
-    speed = 1 / 100
-    num_circles = 6
+    speed = game.config.frequency
+    num_circles = game.config.num_circles
     step = 0
-    wave = []
     drawing_mode = False
     user_drawn_wave = []
-    animation_speed = 1.0
-    show_explanation = False
-    selected_circle = None
-    quality_level = 1  # Medium by default
-    quality_options = ["Low", "Medium", "High"]
-    spline_segments = [3, 5, 10][quality_level]
-    show_coefficients = True
-    
+    sketch_x = 0  # Pixel column of the first sketch sample
+    stroke = game.stroke
+    stroke_count = stroke.count
+    live = None  # Series of the stroke being drawn, see follow_stroke()
+    plane_mode = False  # Retrace a closed 2D drawing, see analyse_plane()
+    plane_terms = None  # Centre, coefficients and harmonics of the figure
+    plane_centre = 0j
+    outline = None  # One period of the tip in plane mode
+    OUTLINE_SAMPLES = 1024
+    live_stroke = stroke.strokes  # The stroke live was built from
+    followed = stroke.strokes  # The stroke follow_stroke() is reading
+    fed = 0  # Samples of that stroke already in the series
+    drawn_samples = None
+    sketch_period = None  # Columns in a period of a drawn series
+    waveform = game.config.waveform
+    animation_speed = game.config.speed
+    show_explanation = game.config.show_help
+    quality_level = game.config.quality  # Medium by default
+    quality_options = ["Low", "Medium", "High", "Auto"]
+    AUTO_QUALITY = 3
+    auto_quality = AdaptiveQuality(game.config.fps)
+
+    def render_settings():
+        if quality_level == AUTO_QUALITY:
+            return auto_quality.settings
+        return {
+            "spline_segments": [3, 5, 10][quality_level],
+            "trace_step": 1,
+            "min_radius": MIN_DRAWN_RADIUS,
+            "antialias": quality_level == 2,
+        }
+
+    spline_segments = render_settings()["spline_segments"]
+    trace_step = render_settings()["trace_step"]
+    min_drawn_radius = render_settings()["min_radius"]
+    antialias = render_settings()["antialias"]
+    atlas = CircleAtlas()  # Circle outlines of the current series and theme
+    show_coefficients = game.config.show_coefficients
+
+    # Harmonic numbers, relative amplitudes and phases of the current series
+    def build_series():
+        if plane_terms is not None:
+            _, c, n = plane_terms
+            c = c[:num_circles]
+            return n[:num_circles], np.abs(c) / MAX_RADIUS, np.angle(c)
+        if drawn_samples is not None:
+            n, amplitudes, phases = analysis.fourier_series(drawn_samples,
+                                                            num_circles)
+            return n, amplitudes / MAX_RADIUS, phases
+        return waveforms.harmonic_table(waveform, num_circles)
+
+    harmonics, amplitudes, phases = build_series()
+    coefficients, _ = epicycles.make_series(MAX_RADIUS * amplitudes,
+                                            harmonics, phases)
+
+    # The circles in the order they are chained up for drawing, the
+    # visible ones first and all sub-pixel ones after them as the tail.
+    # The points that get drawn are the first tail_start + 1 points of
+    # that chain, i.e. the centres and the tail start, and the tip.
+    def arrange_chain():
+        order, count = epicycles.level_of_detail(coefficients,
+                                                 min_drawn_radius)
+        points = np.unique(np.append(np.arange(count + 1), len(order)))
+        return order, count, coefficients[order], harmonics[order], points
+
+    chain_order, tail_start, chain, chain_harmonics, columns = arrange_chain()
+    path_cache = epicycles.PathCache()
+    path = None  # One period of those points, see chain_points()
+    path_ready = False
+
     # Calculate total radius for proper positioning
     def calculate_total_radius():
-        total = 0
-        for i in range(num_circles):
-            n = 2 * i + 1
-            radius_contribution = MAX_RADIUS * (4 / (n * pi))
-            total += radius_contribution
-        return int(total)
-    
+        return int(epicycles.total_radius(coefficients))
+
     total_radius = calculate_total_radius()
-    CENTER_X = total_radius + 32
+    CENTER_X = min(total_radius, MAX_LAYOUT_RADIUS) + 32
     CENTER_Y = vh(60)
     LINE_X = CENTER_X * 2
     LINE_W = vw(100) - LINE_X - 20
-    
+    wave = RingBuffer(LINE_W)  # Traced tip heights, newest first
+
     # Control positions
     CTRLS_Y = vh(5)
-    
+
     # Basic controls
     freq_dec_rect = pygame.Rect((vw(5), CTRLS_Y), (BTN_W, BTN_H))
-    freq_label = font.lg.render(f"Frequency", True, TEXT_COLOR)
     freq_inc_rect = pygame.Rect((vw(5) + BTN_W + 4, CTRLS_Y), (BTN_W, BTN_H))
-    
+
     circles_dec_rect = pygame.Rect((vw(20), CTRLS_Y), (BTN_W, BTN_H))
-    circles_label = font.lg.render(f"Circles / Accuracy", True, TEXT_COLOR)
-    circles_inc_rect = pygame.Rect((vw(20) + BTN_W + 4, CTRLS_Y), (BTN_W, BTN_H))
-    
+    circles_inc_rect = pygame.Rect((vw(20) + BTN_W + 4, CTRLS_Y),
+                                   (BTN_W, BTN_H))
+
     # New controls
-    theme_toggle_rect = pygame.Rect((vw(35), CTRLS_Y), (BTN_W*1.5, BTN_H))
-    theme_label = font.md.render(f"Theme", True, TEXT_COLOR)
-    
+    theme_toggle_rect = pygame.Rect((vw(35), CTRLS_Y), (BTN_W * 1.5, BTN_H))
+
     # Preset buttons
     preset_y = CTRLS_Y + BTN_H + vh(8)
-    square_btn = pygame.Rect((vw(5), preset_y), (BTN_W*1.5, BTN_H))
-    sawtooth_btn = pygame.Rect((vw(15), preset_y), (BTN_W*1.5, BTN_H))
-    triangle_btn = pygame.Rect((vw(25), preset_y), (BTN_W*1.5, BTN_H))
-    
+    square_btn = pygame.Rect((vw(5), preset_y), (BTN_W * 1.5, BTN_H))
+    sawtooth_btn = pygame.Rect((vw(15), preset_y), (BTN_W * 1.5, BTN_H))
+    triangle_btn = pygame.Rect((vw(25), preset_y), (BTN_W * 1.5, BTN_H))
+
     # Animation speed control
     speed_slider_rect = pygame.Rect((vw(45), CTRLS_Y), (vw(15), vh(2)))
-    speed_handle_rect = pygame.Rect((vw(45) + (animation_speed * vw(15)), CTRLS_Y - vh(1)), (vw(2), vh(4)))
-    speed_label = font.md.render(f"Animation Speed", True, TEXT_COLOR)
-    
+    speed_handle_rect = pygame.Rect(
+        (vw(45) + (animation_speed * vw(15)), CTRLS_Y - vh(1)),
+        (vw(2), vh(4)))
+
     # Drawing mode toggle
-    drawing_btn = pygame.Rect((vw(65), CTRLS_Y), (BTN_W*1.8, BTN_H))
-    
+    drawing_btn = pygame.Rect((vw(65), CTRLS_Y), (BTN_W * 1.8, BTN_H))
+
     # Help/explanation toggle
-    help_btn = pygame.Rect((vw(75), CTRLS_Y), (BTN_W*1.5, BTN_H))
-    
+    help_btn = pygame.Rect((vw(75), CTRLS_Y), (BTN_W * 1.5, BTN_H))
+
     # Quality selector
-    quality_btn = pygame.Rect((vw(35), preset_y), (BTN_W*1.5, BTN_H))
-    
+    quality_btn = pygame.Rect((vw(35), preset_y), (BTN_W * 1.5, BTN_H))
+
     # Coefficient display toggle
-    coef_btn = pygame.Rect((vw(45), preset_y), (BTN_W*2, BTN_H))
-    
+    coef_btn = pygame.Rect((vw(45), preset_y), (BTN_W * 2, BTN_H))
+
+    # 2D drawing mode toggle
+    plane_btn = pygame.Rect((vw(59), preset_y), (BTN_W * 1.5, BTN_H))
+
+    # Static UI is drawn into these layers only when ui_dirty is set
+    ui_layer = pygame.Surface(screen.get_size(), 0, screen)
+    help_layer = pygame.Surface((vw(90), vh(30)), pygame.SRCALPHA)
+    ui_dirty = True
+    game.background = ui_layer
+
     # Explanation text
     explanation_text = [
-        "The Fourier series represents periodic functions as sums of sines and cosines.",
+        "The Fourier series represents periodic functions as sums of "
+        "sines and cosines.",
         "More circles (higher n) create more accurate approximations.",
-        "Each circle represents a term in the series: a_n*cos(nx) + b_n*sin(nx).",
-        "The square wave is approximated by: 4/π * (sin(x) + sin(3x)/3 + sin(5x)/5 + ...)",
-        "The sawtooth wave is approximated by: 2/π * (sin(x) - sin(2x)/2 + sin(3x)/3 - ...)",
-        "The triangle wave is approximated by: 8/π² * (sin(x) - sin(3x)/9 + sin(5x)/25 - ...)"
+        "Each circle represents a term in the series: "
+        "a_n*cos(nx) + b_n*sin(nx).",
+        "The square wave is approximated by: "
+        "4/π * (sin(x) + sin(3x)/3 + sin(5x)/5 + ...)",
+        "The sawtooth wave is approximated by: "
+        "2/π * (sin(x) - sin(2x)/2 + sin(3x)/3 - ...)",
+        "The triangle wave is approximated by: "
+        "8/π² * (sin(x) - sin(3x)/9 + sin(5x)/25 - ...)"
     ]
-    
+
     # Preset wave coefficients
-    def set_square_wave():
-        nonlocal num_circles, wave
-        num_circles = min(10, num_circles)  # Limit for performance
-        wave = []  # Reset wave
-    
-    def set_sawtooth_wave():
-        nonlocal num_circles, wave
-        num_circles = min(10, num_circles)  # Limit for performance
-        wave = []  # Reset wave
-    
-    def set_triangle_wave():
-        nonlocal num_circles, wave
-        num_circles = min(10, num_circles)  # Limit for performance
-        wave = []  # Reset wave
-    
+    def set_waveform(name):
+        nonlocal drawn_samples, waveform, plane_mode, plane_terms
+        drawn_samples = None
+        plane_mode = False
+        plane_terms = None
+        waveform = name
+        update_series()
+
     def toggle_theme():
+        nonlocal ui_dirty
         game.config.dark = not game.config.dark
         update_colors()
-    
-    def draw_controls():
+        ui_dirty = True
+        font.clear_cache()  # Drop text rendered in the old colours
+        atlas.clear()
+
+    def draw_controls(surface):
         # Update text colors based on theme
-        freq_label_surf = font.lg.render(f"Frequency", True, TEXT_COLOR)
-        circles_label_surf = font.lg.render(f"Circles / Accuracy", True, TEXT_COLOR)
-        theme_label_surf = font.md.render(f"Theme: {'Dark' if game.config.dark else 'Light'}", True, TEXT_COLOR)
-        speed_label_surf = font.md.render(f"Animation Speed", True, TEXT_COLOR)
-        drawing_label = font.md.render(f"{'✏️ Drawing Mode' if drawing_mode else '📊 Wave Mode'}", True, TEXT_COLOR)
-        help_label = font.md.render(f"{'Hide Help' if show_explanation else 'Show Help'}", True, TEXT_COLOR)
-        quality_label = font.md.render(f"Quality: {quality_options[quality_level]}", True, TEXT_COLOR)
-        coef_label = font.md.render(f"{'Hide' if show_coefficients else 'Show'} Coefficients", True, TEXT_COLOR)
-        
+        theme = "Dark" if game.config.dark else "Light"
+        drawing = "✏️ Drawing Mode" if drawing_mode else "📊 Wave Mode"
+        help_text = "Hide Help" if show_explanation else "Show Help"
+        quality = quality_options[quality_level]
+        coef = "Hide" if show_coefficients else "Show"
+        plane = "1D Waves" if plane_mode else "2D Drawing"
+        freq_label_surf = font.render("Frequency", "lg", TEXT_COLOR)
+        circles_label_surf = font.render("Circles / Accuracy", "lg",
+                                         TEXT_COLOR)
+        theme_label_surf = font.render(f"Theme: {theme}", "md", TEXT_COLOR)
+        speed_label_surf = font.render("Animation Speed", "md", TEXT_COLOR)
+        drawing_label = font.render(drawing, "md", TEXT_COLOR)
+        help_label = font.render(help_text, "md", TEXT_COLOR)
+        quality_label = font.render(f"Quality: {quality}", "md", TEXT_COLOR)
+        coef_label = font.render(f"{coef} Coefficients", "md", TEXT_COLOR)
+        plane_label = font.render(plane, "md", TEXT_COLOR)
+        PLUS = font.render("+", "lg", TEXT_COLOR)
+        MINUS = font.render("-", "lg", TEXT_COLOR)
+
         # Basic controls
-        pygame.draw.rect(screen, BUTTON_COLOR, freq_dec_rect)
-        game.blit_centred(MINUS, freq_dec_rect.center)
-        pygame.Surface.blit(screen, freq_label_surf, (freq_dec_rect.x, CTRLS_Y - 26), area=None, special_flags=0)
-        pygame.draw.rect(screen, BUTTON_COLOR, freq_inc_rect)
-        game.blit_centred(PLUS, freq_inc_rect.center)
-        
-        pygame.draw.rect(screen, BUTTON_COLOR, circles_dec_rect)
-        game.blit_centred(MINUS, circles_dec_rect.center)
-        pygame.Surface.blit(screen, circles_label_surf, (circles_dec_rect.x, CTRLS_Y - 26), area=None, special_flags=0)
-        pygame.draw.rect(screen, BUTTON_COLOR, circles_inc_rect)
-        game.blit_centred(PLUS, circles_inc_rect.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, freq_dec_rect)
+        blit_centred(surface, MINUS, freq_dec_rect.center)
+        surface.blit(freq_label_surf, (freq_dec_rect.x, CTRLS_Y - 26))
+        pygame.draw.rect(surface, BUTTON_COLOR, freq_inc_rect)
+        blit_centred(surface, PLUS, freq_inc_rect.center)
+
+        pygame.draw.rect(surface, BUTTON_COLOR, circles_dec_rect)
+        blit_centred(surface, MINUS, circles_dec_rect.center)
+        surface.blit(circles_label_surf, (circles_dec_rect.x, CTRLS_Y - 26))
+        pygame.draw.rect(surface, BUTTON_COLOR, circles_inc_rect)
+        blit_centred(surface, PLUS, circles_inc_rect.center)
+
         # Theme toggle
-        pygame.draw.rect(screen, BUTTON_COLOR, theme_toggle_rect)
-        game.blit_centred(theme_label_surf, theme_toggle_rect.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, theme_toggle_rect)
+        blit_centred(surface, theme_label_surf, theme_toggle_rect.center)
+
         # Preset buttons
-        pygame.draw.rect(screen, BUTTON_COLOR, square_btn)
-        square_label = font.md.render("Square Wave", True, TEXT_COLOR)
-        game.blit_centred(square_label, square_btn.center)
-        
-        pygame.draw.rect(screen, BUTTON_COLOR, sawtooth_btn)
-        sawtooth_label = font.md.render("Sawtooth Wave", True, TEXT_COLOR)
-        game.blit_centred(sawtooth_label, sawtooth_btn.center)
-        
-        pygame.draw.rect(screen, BUTTON_COLOR, triangle_btn)
-        triangle_label = font.md.render("Triangle Wave", True, TEXT_COLOR)
-        game.blit_centred(triangle_label, triangle_btn.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, square_btn)
+        square_label = font.render("Square Wave", "md", TEXT_COLOR)
+        blit_centred(surface, square_label, square_btn.center)
+
+        pygame.draw.rect(surface, BUTTON_COLOR, sawtooth_btn)
+        sawtooth_label = font.render("Sawtooth Wave", "md", TEXT_COLOR)
+        blit_centred(surface, sawtooth_label, sawtooth_btn.center)
+
+        pygame.draw.rect(surface, BUTTON_COLOR, triangle_btn)
+        triangle_label = font.render("Triangle Wave", "md", TEXT_COLOR)
+        blit_centred(surface, triangle_label, triangle_btn.center)
+
         # Animation speed control
-        pygame.draw.rect(screen, BUTTON_COLOR, speed_slider_rect)
-        pygame.Surface.blit(screen, speed_label_surf, (speed_slider_rect.x, CTRLS_Y - 26), area=None, special_flags=0)
-        pygame.draw.rect(screen, HIGHLIGHT_COLOR, speed_handle_rect)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, speed_slider_rect)
+        surface.blit(speed_label_surf, (speed_slider_rect.x, CTRLS_Y - 26))
+        pygame.draw.rect(surface, HIGHLIGHT_COLOR, speed_handle_rect)
+
         # Drawing mode toggle
-        pygame.draw.rect(screen, BUTTON_COLOR, drawing_btn)
-        game.blit_centred(drawing_label, drawing_btn.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, drawing_btn)
+        blit_centred(surface, drawing_label, drawing_btn.center)
+
         # Help button
-        pygame.draw.rect(screen, BUTTON_COLOR, help_btn)
-        game.blit_centred(help_label, help_btn.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, help_btn)
+        blit_centred(surface, help_label, help_btn.center)
+
         # Quality selector
-        pygame.draw.rect(screen, BUTTON_COLOR, quality_btn)
-        game.blit_centred(quality_label, quality_btn.center)
-        
+        pygame.draw.rect(surface, BUTTON_COLOR, quality_btn)
+        blit_centred(surface, quality_label, quality_btn.center)
+
         # Coefficient display toggle
-        pygame.draw.rect(screen, BUTTON_COLOR, coef_btn)
-        game.blit_centred(coef_label, coef_btn.center)
-    
-    def display_equation():
+        pygame.draw.rect(surface, BUTTON_COLOR, coef_btn)
+        blit_centred(surface, coef_label, coef_btn.center)
+
+        # 2D drawing mode toggle
+        pygame.draw.rect(surface, BUTTON_COLOR, plane_btn)
+        blit_centred(surface, plane_label, plane_btn.center)
+
+    def display_equation(surface):
         eq_text = "f(x) = "
-        
+
+        # Rotating phasors, both directions, largest first
+        if plane_mode:
+            eq_text = "z(t) = c"
+            for i in range(min(3, len(harmonics))):
+                n = int(harmonics[i])
+                eq_text += f" + {amplitudes[i]:.2f}e^i({n}t{phases[i]:+.2f})"
+            if len(harmonics) > 3:
+                eq_text += " + ..."
+            if plane_terms is None:
+                eq_text = "Draw a closed shape below the buttons"
+
         # Different equations based on preset type
-        if num_circles > 0:
-            for i in range(min(3, num_circles)):
-                n = 2 * i + 1
-                coef = f"{4/(n*pi):.2f}"
-                if i > 0:
-                    eq_text += " + "
-                eq_text += f"{coef}sin({n}x)"
-            
-            if num_circles > 3:
+        elif len(harmonics) > 0:
+            for i in range(min(3, len(harmonics))):
+                n = int(harmonics[i])
+                coef = f"{amplitudes[i]:.2f}"
+                if abs(sin(phases[i])) < 1e-9:
+                    # Presets only use phases of 0 and pi, i.e. signs
+                    if i > 0:
+                        eq_text += " - " if cos(phases[i]) < 0 else " + "
+                    elif cos(phases[i]) < 0:
+                        eq_text += "-"
+                    eq_text += f"{coef}sin({n}x)"
+                else:
+                    if i > 0:
+                        eq_text += " + "
+                    eq_text += f"{coef}sin({n}x{phases[i]:+.2f})"
+
+            if len(harmonics) > 3:
                 eq_text += " + ..."
-        
-        eq_surface = font.md.render(eq_text, True, TEXT_COLOR)
-        screen.blit(eq_surface, (vw(5), vh(15)))
-    
-    def draw_coefficients():
+
+        eq_surface = font.render(eq_text, "md", TEXT_COLOR)
+        surface.blit(eq_surface, (vw(5), vh(15)))
+
+    def draw_coefficients(surface):
         if not show_coefficients:
             return
-            
+
         bar_width = vw(2)
         max_height = vh(15)
         x_start = vw(5)
         y_base = vh(40)
-        
+
         # Draw coefficient bars
-        for i in range(num_circles):
-            n = 2 * i + 1
-            coefficient = 4 / (n * pi)
-            bar_height = coefficient * max_height
-            
+        for i in range(min(MAX_BARS, len(harmonics))):
+            n = int(harmonics[i])
+            coefficient = amplitudes[i]
+            bar_height = min(coefficient, 1.5) * max_height
+
             # Draw bar
-            pygame.draw.rect(screen, CIRCLE_COLORS[i % len(CIRCLE_COLORS)], 
-                            (x_start + i*bar_width*2, y_base - bar_height, bar_width, bar_height))
-            
+            x = x_start + i * bar_width * 2
+            pygame.draw.rect(surface, CIRCLE_COLORS[i % len(CIRCLE_COLORS)],
+                             (x, y_base - bar_height, bar_width, bar_height))
+
             # Draw coefficient value
-            coef_text = font.sm.render(f"{coefficient:.2f}", True, TEXT_COLOR)
-            screen.blit(coef_text, (x_start + i*bar_width*2, y_base + 5))
-            
+            coef_text = font.render(f"{coefficient:.2f}", "sm", TEXT_COLOR)
+            surface.blit(coef_text, (x, y_base + 5))
+
             # Draw n value
-            n_text = font.sm.render(f"n={n}", True, TEXT_COLOR)
-            screen.blit(n_text, (x_start + i*bar_width*2, y_base + 20))
-    
-    def display_help():
-        if not show_explanation:
-            return
-            
+            n_text = font.render(f"n={n}", "sm", TEXT_COLOR)
+            surface.blit(n_text, (x, y_base + 20))
+
+    def display_help(surface):
         # Semi-transparent background for explanation panel
-        help_surface = pygame.Surface((vw(90), vh(30)))
-        help_surface.set_alpha(200)
-        help_surface.fill((30, 30, 40) if game.config.dark else (240, 240, 240))
-        screen.blit(help_surface, (vw(5), vh(70)))
-        
+        dark = game.config.dark
+        surface.fill((30, 30, 40, 200) if dark else (240, 240, 240, 200))
+
         # Display explanation text
-        y_pos = vh(72)
+        y_pos = vh(2)
         for line in explanation_text:
-            text_surf = font.md.render(line, True, TEXT_COLOR)
-            screen.blit(text_surf, (vw(7), y_pos))
+            text_surf = font.render(line, "md", TEXT_COLOR)
+            surface.blit(text_surf, (vw(2), y_pos))
             y_pos += vh(4)
-    
+
+    def blit_centred(surface, surf, pos):
+        rect = surf.get_rect(center=pos)
+        surface.blit(surf, rect.topleft)
+
+    def redraw_ui():
+        nonlocal ui_dirty
+        ui_layer.fill(BG_COLOR)
+        with profiler.stage("draw_controls"):
+            draw_controls(ui_layer)
+        with profiler.stage("display_equation"):
+            display_equation(ui_layer)
+        with profiler.stage("draw_coefficients"):
+            draw_coefficients(ui_layer)
+        if show_explanation:
+            display_help(help_layer)
+        ui_dirty = False
+
+    def analyse_drawing():
+        # Analyse the same period follow_stroke() built up, so the
+        # series does not jump when the pen lifts
+        nonlocal drawn_samples
+        follow_stroke()
+        if live is None or len(user_drawn_wave) < 4:
+            return
+        drawn_samples = live.values.copy()
+        update_series()
+
+    def capture_stroke():
+        # Resample the recorded pointer samples to one per pixel column
+        nonlocal user_drawn_wave, sketch_x, stroke_count
+        if stroke.count == stroke_count:
+            return
+        stroke_count = stroke.count
+        sketch = resample(stroke.samples(), LINE_X, LINE_W)
+        if sketch is not None:
+            sketch_x, user_drawn_wave = sketch
+
+    def follow_stroke():
+        # Move the series along with the pen, O(harmonics) per new pixel
+        # column. The line width is one period and columns not drawn yet
+        # sit on the centre line.
+        nonlocal live, live_stroke, followed, fed, sketch_period
+        if stroke.strokes != followed:
+            followed = stroke.strokes
+            fed = 0
+        if len(stroke) == fed:
+            return
+        samples = stroke.samples()
+        sketch = resample(samples[max(0, fed - 1):], LINE_X, LINE_W)
+        fed = len(samples)
+        if sketch is None:
+            return
+        # Clicks cover no columns and leave the last drawing in place
+        if live is None or live_stroke != followed:
+            live_stroke = followed
+            live = analysis.RunningSpectrum(LINE_W, num_circles)
+        first, ys = sketch
+        offsets = np.arange(first, first + len(ys)) - LINE_X
+        inside = offsets < LINE_W
+        # Backwards, the trace scrolls right and reads like the drawing
+        live.set(LINE_W - 1 - offsets[inside], ys[inside] - CENTER_Y)
+        n, live_amplitudes, live_phases = live.series()
+        sketch_period = live.length
+        set_series(n, live_amplitudes / MAX_RADIUS, live_phases, cached=False)
+
+    def set_series(new_harmonics, new_amplitudes, new_phases, cached=True):
+        nonlocal harmonics, amplitudes, phases, coefficients, ui_dirty
+        nonlocal chain_order, tail_start, chain, chain_harmonics, columns
+        nonlocal path, path_ready
+        harmonics = new_harmonics
+        amplitudes = new_amplitudes
+        phases = new_phases
+        coefficients, _ = epicycles.make_series(MAX_RADIUS * amplitudes,
+                                                harmonics, phases)
+        chain_order, tail_start, chain, chain_harmonics, columns = (
+            arrange_chain())
+        # A series that changes every frame is not worth tabulating
+        path = None
+        path_ready = not cached
+        atlas.clear()  # The radii changed
+        ui_dirty = True
+
+    def analyse_plane():
+        # Use the finished stroke as the figure if it was drawn below the
+        # controls and is more than a click
+        samples = stroke.samples()
+        if len(samples) < 8 or samples[:, 1].min() < preset_y + BTN_H:
+            return
+        # All terms at once, the Circles control only picks how many
+        set_figure(analysis.complex_series(samples[:, :2], MAX_CIRCLES))
+
+    def show_shape(terms):
+        # Scale a loaded outline to fit below the controls
+        _, c, n = terms
+        table = epicycles.PathTable(c, n, [len(c)], OUTLINE_SAMPLES)
+        points = table.points[:, 0]
+        top = preset_y + BTN_H + vh(5)
+        size = max(np.ptp(points.real) / vw(90),
+                   np.ptp(points.imag) / (vh(95) - top), 1e-9)
+        middle = complex(points.real.min() + points.real.max(),
+                         points.imag.min() + points.imag.max()) / 2
+        centre = complex(vw(50), (top + vh(95)) / 2)
+        set_figure((centre - middle / size, c / size, n))
+
+    def set_figure(terms):
+        nonlocal plane_mode, plane_terms, plane_centre, drawing_mode
+        plane_mode = True
+        drawing_mode = False
+        plane_terms = terms
+        plane_centre = terms[0]
+        update_series()
+
+    def update_series():
+        nonlocal total_radius, CENTER_X, LINE_X, LINE_W, outline
+        nonlocal sketch_period
+        sketch_period = None
+        if plane_terms is None and drawn_samples is not None:
+            sketch_period = len(drawn_samples)
+        set_series(*build_series())
+        outline = None
+        if plane_terms is not None and len(coefficients):
+            table = epicycles.PathTable(coefficients, harmonics,
+                                        [len(coefficients)], OUTLINE_SAMPLES)
+            outline = table.points[:, 0] + plane_centre
+            outline = np.column_stack((outline.real, outline.imag))
+        total_radius = calculate_total_radius()
+        CENTER_X = min(total_radius, MAX_LAYOUT_RADIUS) + 32
+        LINE_X = CENTER_X * 2
+        LINE_W = vw(100) - LINE_X - 20
+        wave.resize(LINE_W)  # Reset wave when changing circles
+
+    def apply_quality():
+        nonlocal spline_segments, trace_step, min_drawn_radius, antialias
+        nonlocal chain_order, tail_start, chain, chain_harmonics, columns
+        nonlocal path_ready
+        settings = render_settings()
+        spline_segments = settings["spline_segments"]
+        trace_step = settings["trace_step"]
+        min_drawn_radius = settings["min_radius"]
+        antialias = settings["antialias"]
+        atlas.clear()
+        chain_order, tail_start, chain, chain_harmonics, columns = (
+            arrange_chain())
+        path_ready = False
+
     def handle_controls():
-        nonlocal speed, num_circles, drawing_mode, animation_speed, show_explanation
-        nonlocal quality_level, spline_segments, show_coefficients
-        nonlocal selected_circle, total_radius, CENTER_X, LINE_X, LINE_W
-        
+        nonlocal speed, num_circles, drawing_mode, animation_speed
+        nonlocal show_explanation, quality_level, show_coefficients
+        nonlocal user_drawn_wave, stroke_count, ui_dirty, path_ready
+        nonlocal plane_mode, plane_terms
+
+        if drawing_mode:
+            capture_stroke()
+            follow_stroke()
+
         for event in game.events:
             if event.type == pygame.MOUSEBUTTONUP:
                 mouse_pos = pygame.mouse.get_pos()
-                
+
                 # Basic controls
                 if freq_dec_rect.collidepoint(mouse_pos):
                     speed = max(1 / 1000, speed - SPEED_STEP)
-                
+                    path_ready = False
+
                 if freq_inc_rect.collidepoint(mouse_pos):
                     speed = min(1 / 5, speed + SPEED_STEP)
-                
-                if circles_dec_rect.collidepoint(mouse_pos):
-                    num_circles = max(1, num_circles - 1)
-                    total_radius = calculate_total_radius()
-                    CENTER_X = total_radius + 32
-                    LINE_X = CENTER_X * 2
-                    LINE_W = vw(100) - LINE_X - 20
-                    wave = []  # Reset wave when changing circles
-                
-                if circles_inc_rect.collidepoint(mouse_pos):
-                    num_circles = min(15, num_circles + 1)
-                    total_radius = calculate_total_radius()
-                    CENTER_X = total_radius + 32
-                    LINE_X = CENTER_X * 2
-                    LINE_W = vw(100) - LINE_X - 20
-                    wave = []  # Reset wave when changing circles
-                
+                    path_ready = False
+
+                fewer = num_circles > 1
+                more = num_circles < MAX_CIRCLES
+                if circles_dec_rect.collidepoint(mouse_pos) and fewer:
+                    # Step one at a time for few circles, then by octaves
+                    if num_circles <= 16:
+                        num_circles -= 1
+                    else:
+                        num_circles //= 2
+                    num_circles = max(1, num_circles)
+                    update_series()
+
+                if circles_inc_rect.collidepoint(mouse_pos) and more:
+                    if num_circles < 16:
+                        num_circles += 1
+                    else:
+                        num_circles *= 2
+                    num_circles = min(MAX_CIRCLES, num_circles)
+                    update_series()
+
                 # Theme toggle
                 if theme_toggle_rect.collidepoint(mouse_pos):
                     toggle_theme()
-                
+
                 # Preset buttons
                 if square_btn.collidepoint(mouse_pos):
-                    set_square_wave()
-                
+                    set_waveform("square")
+
                 if sawtooth_btn.collidepoint(mouse_pos):
-                    set_sawtooth_wave()
-                
+                    set_waveform("sawtooth")
+
                 if triangle_btn.collidepoint(mouse_pos):
-                    set_triangle_wave()
-                
+                    set_waveform("triangle")
+
                 # Drawing mode toggle
                 if drawing_btn.collidepoint(mouse_pos):
                     drawing_mode = not drawing_mode
+                    ui_dirty = True
                     if drawing_mode:
                         user_drawn_wave = []
+                        stroke_count = stroke.count
+                        if plane_mode:
+                            plane_mode = False
+                            plane_terms = None
+                            update_series()
                     else:
-                        wave = []  # Reset wave when switching modes
-                
+                        wave.clear()  # Reset wave when switching modes
+                        analyse_drawing()
+
                 # Help button
                 if help_btn.collidepoint(mouse_pos):
                     show_explanation = not show_explanation
-                
+                    ui_dirty = True
+
                 # Quality selector
                 if quality_btn.collidepoint(mouse_pos):
                     quality_level = (quality_level + 1) % len(quality_options)
-                    spline_segments = [3, 5, 10][quality_level]
-                
+                    apply_quality()
+                    ui_dirty = True
+
                 # Coefficient display toggle
                 if coef_btn.collidepoint(mouse_pos):
                     show_coefficients = not show_coefficients
-            
+                    ui_dirty = True
+
+                # 2D drawing mode toggle
+                if plane_btn.collidepoint(mouse_pos):
+                    plane_mode = not plane_mode
+                    plane_terms = None
+                    drawing_mode = False
+                    update_series()
+
             # Handle speed slider
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if speed_slider_rect.collidepoint(event.pos):
-                    animation_speed = (event.pos[0] - speed_slider_rect.x) / speed_slider_rect.width
+                    slider_x = event.pos[0] - speed_slider_rect.x
+                    animation_speed = slider_x / speed_slider_rect.width
                     animation_speed = max(0.1, min(1.0, animation_speed))
-                    speed_handle_rect.x = speed_slider_rect.x + (animation_speed * speed_slider_rect.width) - speed_handle_rect.width/2
-            
-            # Handle drawing mode
-            if drawing_mode and event.type == pygame.MOUSEMOTION and pygame.mouse.get_pressed()[0]:
+                    path_ready = False
+                    handle_x = animation_speed * speed_slider_rect.width
+                    handle_x -= speed_handle_rect.width / 2
+                    speed_handle_rect.x = speed_slider_rect.x + handle_x
+                    ui_dirty = True
+
+            # Turn the finished stroke into a Fourier series
+            if drawing_mode and event.type == pygame.MOUSEBUTTONUP:
                 if LINE_X <= event.pos[0] <= LINE_X + LINE_W:
-                    user_drawn_wave.append(event.pos[1
+                    analyse_drawing()
+
+            if plane_mode and event.type == pygame.MOUSEBUTTONUP:
+                analyse_plane()
+
+            # An outline loaded from a file, see FourierSim.load_shape()
+            if event.type == game.shape_event:
+                show_shape(event.terms)
+
+    def chain_points(time):
+        # Look the points up in a table of one period, or work them out
+        # when the table would be too large
+        nonlocal path, path_ready
+        if not path_ready:
+            samples = epicycles.period_samples(step_size(),
+                                               game.config.path_resolution)
+            path = path_cache.get(chain, chain_harmonics, columns, samples)
+            path_ready = True
+        origin = plane_centre if plane_mode else complex(CENTER_X, CENTER_Y)
+        if path is not None:
+            return path.at(time) + origin
+        centres, tips = epicycles.evaluate(chain, chain_harmonics, time,
+                                           origin)
+        return np.append(centres[0], tips[0])[columns]
+
+    def draw_epicycles(time):
+        points = chain_points(time)
+        tip = points[-1]
+        rects = []
+
+        # Only circles that are at least a pixel across are drawn one by one
+        for k, i in enumerate(chain_order[:tail_start].tolist()):
+            centre = (points[k].real, points[k].imag)
+            end = (points[k + 1].real, points[k + 1].imag)
+            color = CIRCLE_COLORS[i % len(CIRCLE_COLORS)]
+            rects.append(atlas.blit(screen, centre, abs(coefficients[i]),
+                                    color, 1, antialias))
+            rects.append(pygame.draw.line(screen, CIRCLE_COLOR, centre, end,
+                                          STROKE_WIDTH))
+
+        # The sub-pixel circles add up to a single tail vector
+        if tail_start < len(coefficients):
+            start = points[tail_start]
+            rects.append(pygame.draw.line(screen, CIRCLE_COLOR,
+                                          (start.real, start.imag),
+                                          (tip.real, tip.imag), STROKE_WIDTH))
+
+        if rects:
+            game.mark_dirty(rects[0].unionall(rects[1:]))
+        return tip.real, tip.imag
+
+    def step_size():
+        # Radians per simulation step, Config.sim_rate steps per second.
+        # A drawn series moves one column per step, so the trace retraces
+        # the sketch at its own width.
+        if sketch_period is not None and not plane_mode:
+            return 2 * pi / sketch_period
+        return 2 * pi * speed * animation_speed
+
+    def simulate():
+        nonlocal step
+        step += step_size()
+
+        # Trace the newest point at the start of the line, which is not
+        # shown while a 2D figure is
+        if not plane_mode:
+            wave.push(chain_points(step)[-1].imag)
+
+    def draw_plane():
+        # The figure the phasors retrace, the chain and the stroke drawn
+        lines = pygame.draw.aalines if antialias else pygame.draw.lines
+        if outline is not None:
+            game.mark_dirty(lines(screen, WAVE_COLOR, True, outline))
+        if plane_terms is not None:
+            with profiler.stage("epicycles"):
+                x, y = draw_epicycles(step + game.alpha * step_size())
+            game.mark_dirty(pygame.draw.circle(screen, CIRCLE_COLOR,
+                                               (int(x), int(y)), 3))
+        if stroke.active and len(stroke) > 1:
+            game.mark_dirty(lines(screen, HIGHLIGHT_COLOR, False,
+                                  stroke.samples()[:, :2]))
+
+        if show_explanation:
+            game.mark_dirty(screen.blit(help_layer, (vw(5), vh(70))))
+
+    def update():
+        handle_controls()
+
+        # Automatic quality follows the work time of the previous frame
+        if quality_level == AUTO_QUALITY:
+            if auto_quality.record(game.clock.get_rawtime()):
+                apply_quality()
+
+        if ui_dirty:
+            # The main loop restores dirty areas from ui_layer, so a
+            # changed layer has to go out as a full update
+            redraw_ui()
+            screen.blit(ui_layer, (0, 0))
+            game.redraw_all()
+
+        if plane_mode:
+            draw_plane()
+            return
+
+        # Draw between simulation steps so motion stays smooth at any fps
+        with profiler.stage("epicycles"):
+            x, y = draw_epicycles(step + game.alpha * step_size())
+
+        trace = wave.view()
+        if len(trace):
+            game.mark_dirty(pygame.draw.line(screen, WAVE_COLOR, (x, y),
+                                             (LINE_X, trace[0]), 1))
+        game.mark_dirty(pygame.draw.circle(screen, CIRCLE_COLOR,
+                                           (int(x), int(y)), 3))
+        with profiler.stage("draw_catmull_rom_spline"):
+            game.mark_dirty(utils.draw_catmull_rom_spline(
+                screen, trace[::trace_step], LINE_X, WAVE_COLOR,
+                spline_segments, trace_step, STROKE_WIDTH, antialias))
+
+            if drawing_mode and len(user_drawn_wave) > 3:
+                game.mark_dirty(utils.draw_catmull_rom_spline(
+                    screen, user_drawn_wave, sketch_x, HIGHLIGHT_COLOR,
+                    spline_segments, thickness=STROKE_WIDTH,
+                    antialias=antialias))
+
+        if show_explanation:
+            game.mark_dirty(screen.blit(help_layer, (vw(5), vh(70))))
+
+    def invalidate_ui():
+        nonlocal ui_dirty
+        ui_dirty = True
+
+    game.fixed_update_function = simulate
+    game.update_function = update
+    game.redraw_ui_function = invalidate_ui
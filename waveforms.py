@@ -0,0 +1,73 @@
+# Copyright (C) 2024 Spandan Barve
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from functools import lru_cache
+from math import pi
+
+import numpy as np
+
+_generators = {}
+
+
+def register(name):
+    """Register a coefficient generator for a preset waveform.
+
+    A generator takes a harmonic count and returns
+    ``(harmonics, amplitudes, phases)`` arrays describing
+    ``sum(amplitude * sin(harmonic * x + phase))``, with amplitudes
+    relative to the radius of the largest circle.
+    """
+    def decorator(generator):
+        _generators[name] = generator
+        return generator
+    return decorator
+
+
+def names():
+    return list(_generators)
+
+
+@lru_cache(maxsize=32)
+def harmonic_table(name, count):
+    """Return the cached, read-only coefficient table of a preset."""
+    table = tuple(np.asarray(array, dtype=np.float64)
+                  for array in _generators[name](count))
+    for array in table:
+        array.setflags(write=False)
+    return table
+
+
+@register("square")
+def square(count):
+    # 4/pi * (sin(x) + sin(3x)/3 + sin(5x)/5 + ...)
+    harmonics = 2 * np.arange(count) + 1
+    return harmonics, 4 / (harmonics * pi), np.zeros(count)
+
+
+@register("sawtooth")
+def sawtooth(count):
+    # 2/pi * (sin(x) - sin(2x)/2 + sin(3x)/3 - ...)
+    harmonics = np.arange(count) + 1
+    phases = np.where(harmonics % 2, 0, pi)
+    return harmonics, 2 / (harmonics * pi), phases
+
+
+@register("triangle")
+def triangle(count):
+    # 8/pi^2 * (sin(x) - sin(3x)/9 + sin(5x)/25 - ...)
+    harmonics = 2 * np.arange(count) + 1
+    phases = np.where(np.arange(count) % 2, pi, 0)
+    return harmonics, 8 / (pi * pi * harmonics * harmonics), phases